@@ -0,0 +1,181 @@
+"""
+    Perfect play endgame solver
+    searches the game to its end (negamax with alpha beta pruning on bitboards) and finds the exact final disk
+    difference, or only win/loss/draw which is faster
+    a solve can be given a deadline, then it stops with SolverTimeout when the time is over
+"""
+
+import time
+import src.Agent.Transposition as Transposition
+import src.Logic.Bitboard as Bitboard
+
+# Constant values
+ENDGAME_EMPTIES = 10  # Minimax uses the solver when there are at most this many empty cells
+FASTEST_FIRST_EMPTIES = 6  # fastest-first ordering is used in nodes with at least this many empty cells
+HASH_EMPTIES = 6  # positions with at least this many empty cells are stored in the hash table
+TABLE_SIZE = 1 << 14
+TIME_CHECK_NODES = 256  # the deadline is checked once in this many nodes (a power of two)
+EXACT_SCORE = "exact"  # final disk difference
+WIN_LOSS_DRAW = "wld"  # only the sign of the final disk difference: 1, 0 or -1
+# the four 4*4 quadrants of the board, for parity ordering
+QUADRANTS = (0x000000000F0F0F0F, 0x00000000F0F0F0F0, 0x0F0F0F0F00000000, 0xF0F0F0F000000000)
+
+
+# This Exception will raised when the deadline of a solve is over in the middle of the search
+class SolverTimeout(Exception):
+    """ Deadline of the solve is over """
+
+
+def final_score(own, opponent):
+    """ Disk difference at the end of the game, empty cells belong to the winner """
+    own_count = Bitboard.popcount(own)
+    opponent_count = Bitboard.popcount(opponent)
+    empties = 64 - own_count - opponent_count
+    if own_count > opponent_count:
+        return own_count - opponent_count + empties
+    if own_count < opponent_count:
+        return own_count - opponent_count - empties
+    return 0
+
+
+def bit_to_cell(bit):
+    """ Converts a cell bit to (row, col) """
+    index = bit.bit_length() - 1
+    return index // Bitboard.COLUMN_SIZE, index % Bitboard.COLUMN_SIZE
+
+
+class EndgameSolver:
+    """ Exact solver for positions with few empty cells
+    move ordering: cells in quadrants with an odd number of empty cells are played first (parity), and in nodes with
+    enough empty cells the moves that leave the opponent with fewer moves are searched first (fastest-first)
+    """
+
+    def __init__(self, table_size=TABLE_SIZE):
+        self.table = Transposition.TranspositionTable(table_size)
+        self.nodes = 0  # number of searched nodes (since the solver was created)
+        self.deadline = None  # time.perf_counter() value that the current solve must stop at
+
+    def solve(self, own, opponent, mode=EXACT_SCORE, deadline=None):
+        """ Solves the position with 'own' to move
+        returns (score, best move) where best move is (row, col) or None if 'own' has no moves,
+        score is the final disk difference for 'own' (or its sign if mode is WIN_LOSS_DRAW)
+        raises SolverTimeout if a deadline (time.perf_counter() value) is given and the solve isn't over by then """
+        self.table.new_search()
+        self.deadline = deadline
+        try:
+            return self.solve_root(own, opponent, mode)
+        finally:
+            self.deadline = None
+
+    def solve_root(self, own, opponent, mode):
+        """ Searches the moves of the root of solve """
+        moves = Bitboard.get_moves(own, opponent)
+        if not moves:
+            # no need to search for a best move (pass or end of game)
+            score = self.negamax(own, opponent, -65, 65, False)
+            return (score if mode == EXACT_SCORE else (score > 0) - (score < 0)), None
+
+        if mode == EXACT_SCORE:
+            alpha, beta = -65, 65
+        else:  # a null window around zero is enough to find win/loss/draw
+            alpha, beta = -1, 1
+        best_score = -65
+        best_move = 0
+        for bit in self.ordered_moves(own, opponent, moves):
+            flips = Bitboard.get_flips(own, opponent, bit)
+            score = -self.negamax(opponent & ~flips, own | flips | bit, -beta, -alpha, False)
+            if score > best_score:
+                best_score = score
+                best_move = bit
+            if best_score > alpha:
+                alpha = best_score
+            if alpha >= beta:
+                break
+        if mode == WIN_LOSS_DRAW:
+            best_score = (best_score > 0) - (best_score < 0)
+        return best_score, bit_to_cell(best_move)
+
+    def negamax(self, own, opponent, alpha, beta, passed):
+        """ Final disk difference for 'own' (exact if it's between alpha and beta, else a bound) """
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & (TIME_CHECK_NODES - 1) \
+                and time.perf_counter() > self.deadline:
+            raise SolverTimeout()
+        moves = Bitboard.get_moves(own, opponent)
+        if not moves:
+            if passed:  # none of the players can move
+                return final_score(own, opponent)
+            return -self.negamax(opponent, own, -beta, -alpha, True)
+
+        empties = 64 - Bitboard.popcount(own | opponent)
+        if empties == 1:  # the only move, no need for ordering or the table
+            flips = Bitboard.get_flips(own, opponent, moves)
+            return final_score(own | flips | moves, opponent & ~flips)
+
+        key = None
+        table_move = 0
+        if empties >= HASH_EMPTIES:
+            key = hash((own, opponent))
+            entry = self.table.probe(key)
+            if entry is not None:
+                (score, bound, table_move) = (entry[2], entry[3], entry[4])
+                if ((bound == Transposition.EXACT) |
+                        ((bound == Transposition.LOWER_BOUND) & (score >= beta)) |
+                        ((bound == Transposition.UPPER_BOUND) & (score <= alpha))):
+                    return score
+
+        alpha_bound = alpha
+        best_score = -65
+        best_move = 0
+        for bit in self.ordered_moves(own, opponent, moves, table_move, empties):
+            flips = Bitboard.get_flips(own, opponent, bit)
+            score = -self.negamax(opponent & ~flips, own | flips | bit, -beta, -alpha, False)
+            if score > best_score:
+                best_score = score
+                best_move = bit
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if key is not None:
+            if best_score >= beta:
+                bound = Transposition.LOWER_BOUND
+            elif best_score <= alpha_bound:
+                bound = Transposition.UPPER_BOUND
+            else:
+                bound = Transposition.EXACT
+            self.table.store(key, empties, best_score, bound, best_move)
+        return best_score
+
+    @staticmethod
+    def ordered_moves(own, opponent, moves, first_move=0, empties=64):
+        """ Returns the move bits in search order: the table move, then parity and fastest-first ordering """
+        empty = ~(own | opponent) & Bitboard.FULL_BOARD
+        odd_quadrants = 0
+        for quadrant in QUADRANTS:
+            if Bitboard.popcount(empty & quadrant) & 1:
+                odd_quadrants |= quadrant
+
+        ordered = []
+        while moves:
+            bit = moves & -moves
+            moves ^= bit
+            if bit == first_move:
+                priority = -1
+            else:
+                priority = 0 if bit & odd_quadrants else 1
+                if empties >= FASTEST_FIRST_EMPTIES:
+                    flips = Bitboard.get_flips(own, opponent, bit)
+                    # number of the opponent moves after this move
+                    mobility = Bitboard.popcount(Bitboard.get_moves(opponent & ~flips, own | flips | bit))
+                    priority += 2 * mobility
+            ordered.append((priority, bit))
+        ordered.sort()
+        return [bit for (priority, bit) in ordered]
+
+    def get_stats(self):
+        """ Returns the node counter and the hash table counters """
+        stats = self.table.get_stats()
+        stats["nodes"] = self.nodes
+        return stats
@@ -0,0 +1,62 @@
+"""
+    Cache of heuristic scores for the Minimax search
+    scores are kept by key (Zobrist hash of the position xor the key of the weight list, see Minimax.evaluation_key),
+    the number of scores is bounded and the oldest one is removed when the cache is full
+"""
+
+from collections import OrderedDict
+
+# Constant values
+DEFAULT_SIZE = 1 << 16  # maximum number of scores
+LRU = "lru"  # the least recently used score is removed
+FIFO = "fifo"  # the first stored score is removed (a hit doesn't change the order, so it's a little faster)
+EVICTION_POLICIES = (LRU, FIFO)
+
+
+class EvaluationCache:
+    """ Bounded cache of scores with LRU or FIFO eviction """
+
+    def __init__(self, size=DEFAULT_SIZE, eviction=LRU):
+        if size <= 0:
+            raise ValueError("size of the evaluation cache must be positive")
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError("unknown eviction policy: " + str(eviction))
+        self.size = size
+        self.eviction = eviction
+        self.scores = OrderedDict()
+        # counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """ Returns the score of the given key or None """
+        score = self.scores.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.eviction == LRU:
+            self.scores.move_to_end(key)
+        return score
+
+    def put(self, key, score):
+        """ Stores a score, the oldest score is removed if the cache is full """
+        self.scores[key] = score
+        if len(self.scores) > self.size:
+            self.scores.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.scores.clear()
+
+    def get_stats(self):
+        """ Returns the counters of the cache and the number of stored scores """
+        lookups = self.hits + self.misses
+        return {"size": self.size,
+                "eviction": self.eviction,
+                "filled": len(self.scores),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
@@ -1,3 +1,4 @@
+import numpy
 from src.Logic.Othello_logic import *
 
 # Constant values
@@ -37,9 +38,111 @@ def inside_edge_and_not_corner(x, y, index):
             ((y == helper2) & (helper1 + 1 <= x <= helper2 - 1)))
 
 
+def region_mask(is_in_region):
+    """ Builds the bitboard of all the cells (x, y) that is_in_region(x, y) is true for """
+    mask = 0
+    for x in range(ROW_SIZE):
+        for y in range(COLUMN_SIZE):
+            if is_in_region(x, y):
+                mask |= 1 << (x * COLUMN_SIZE + y)
+    return mask
+
+
+# Region of each feature as a bitboard (precomputed once, see the matrix in Features)
+CORNERS_MASK = region_mask(lambda x, y: is_corner(x, y, 0))  # 1
+EDGES_NEXT_TO_CORNER_MASK = region_mask(lambda x, y: on_edge_and_not_corner(x, y, 1))  # 2
+USEFUL_EDGES_MASK = region_mask(lambda x, y: on_edge_and_not_corner(x, y, 2))  # 3
+MIDDLE_EDGES_MASK = region_mask(lambda x, y: on_edge_and_not_corner(x, y, 3))  # 4
+CORNERS_OF_ONE_BEFORE_EDGE_MASK = region_mask(lambda x, y: is_corner(x, y, 1))  # 5
+ONE_BEFORE_EDGE_NORMAL_MASK = region_mask(lambda x, y: inside_edge_and_not_corner(x, y, 1))  # 6
+MIDDLE_SQUARE_CORNERS_MASK = region_mask(lambda x, y: is_corner(x, y, 2))  # 7
+MIDDLE_SQUARE_NORMAL_MASK = region_mask(lambda x, y: inside_edge_and_not_corner(x, y, 2) | is_corner(x, y, 3))  # 8
+NUM_OF_CELLS = ROW_SIZE * COLUMN_SIZE
+
+# Region mask of each feature, the last one (point difference) uses all the cells
+FEATURE_MASKS = (CORNERS_MASK, EDGES_NEXT_TO_CORNER_MASK, USEFUL_EDGES_MASK, MIDDLE_EDGES_MASK,
+                 CORNERS_OF_ONE_BEFORE_EDGE_MASK, ONE_BEFORE_EDGE_NORMAL_MASK, MIDDLE_SQUARE_CORNERS_MASK,
+                 MIDDLE_SQUARE_NORMAL_MASK, (1 << NUM_OF_CELLS) - 1)
+
+
+def region_matrix():
+    """ (64, 9) 0/1 matrix of the cells of each feature region, used for counting the disks with numpy """
+    matrix = numpy.zeros((NUM_OF_CELLS, len(FEATURE_MASKS)), dtype=numpy.int16)
+    for feature, mask in enumerate(FEATURE_MASKS):
+        for cell in range(NUM_OF_CELLS):
+            matrix[cell, feature] = (mask >> cell) & 1
+    return matrix
+
+
+REGION_MATRIX = region_matrix()
+# feature = (disk count * scale - offset) / divisor, the same operations as feature_list
+FEATURE_SCALES = numpy.array([1, 1, 1, 1, 1, 1, 1, 1, 2])
+FEATURE_OFFSETS = numpy.array([0, 0, 0, 0, 0, 0, 0, 0, NUM_OF_CELLS])
+FEATURE_DIVISORS = numpy.array([1, -NORMALIZATION_CONST8, NORMALIZATION_CONST8, NORMALIZATION_CONST8, -1,
+                                -NORMALIZATION_CONST12, 1, NORMALIZATION_CONST12, NORMALIZATION_CONST64])
+
+
+def feature_list(disks):
+    """ Returns the 9 features of the color whose disks are given (the same as Features.get_features) """
+    return [(disks & CORNERS_MASK).bit_count(),
+            -(disks & EDGES_NEXT_TO_CORNER_MASK).bit_count() / NORMALIZATION_CONST8,
+            (disks & USEFUL_EDGES_MASK).bit_count() / NORMALIZATION_CONST8,
+            (disks & MIDDLE_EDGES_MASK).bit_count() / NORMALIZATION_CONST8,
+            -(disks & CORNERS_OF_ONE_BEFORE_EDGE_MASK).bit_count(),
+            -(disks & ONE_BEFORE_EDGE_NORMAL_MASK).bit_count() / NORMALIZATION_CONST12,
+            (disks & MIDDLE_SQUARE_CORNERS_MASK).bit_count(),
+            (disks & MIDDLE_SQUARE_NORMAL_MASK).bit_count() / NORMALIZATION_CONST12,
+            (2 * disks.bit_count() - NUM_OF_CELLS) / NORMALIZATION_CONST64]
+
+
+def evaluate(agent_disks, player_disks, weight_list):
+    """ Weighted score of the agent features minus the weighted score of the player features """
+    total = 0
+    for weight, feature in zip(weight_list, feature_list(agent_disks)):
+        total += weight * feature
+    for weight, feature in zip(weight_list, feature_list(player_disks)):
+        total -= weight * feature
+    return total
+
+
+def disks_to_cells(disks):
+    """ Converts an array of N bitboards to a (N, 64) array of 0/1 (one column per cell) """
+    disks = numpy.asarray(disks, dtype='<u8').reshape(-1)
+    return numpy.unpackbits(disks.view(numpy.uint8).reshape(-1, 8), axis=1, bitorder='little')
+
+
+def features_batch(disks):
+    """ Returns a (N, 9) array of the features of N bitboards (of one color each)
+    row i is exactly equal to feature_list(disks[i]) (same operations on the disk counts) """
+    counts = disks_to_cells(disks) @ REGION_MATRIX
+    return (counts * FEATURE_SCALES - FEATURE_OFFSETS) / FEATURE_DIVISORS
+
+
+def evaluate_features(agent_features, player_features, weights):
+    """ Scores (N, 9) feature arrays of agent and player against one weight list (result shape is (N,)) or against
+    a (M, 9) array of weight lists (result shape is (N, M))
+    the weighted features are added up one by one in the same order as evaluate (cumsum is sequential),
+    so the scores are exactly the same as evaluate's """
+    weights = numpy.asarray(weights, dtype=float)
+    if weights.ndim == 2:  # every board is scored with every weight list
+        agent_features = agent_features[:, None, :]
+        player_features = player_features[:, None, :]
+    terms = numpy.concatenate((weights * agent_features, -(weights * player_features)), axis=-1)
+    return numpy.cumsum(terms, axis=-1)[..., -1]
+
+
+def evaluate_batch(agent_disks, player_disks, weights):
+    """ Scores N boards in one call, the same as evaluate for each pair of (agent_disks[i], player_disks[i])
+    weights can be one weight list or a (M, 9) array of weight lists (then the result is a (N, M) array) """
+    features = features_batch(numpy.concatenate((numpy.asarray(agent_disks, dtype='<u8').reshape(-1),
+                                                  numpy.asarray(player_disks, dtype='<u8').reshape(-1))))
+    size = len(features) // 2
+    return evaluate_features(features[:size], features[size:], weights)
+
+
 class Features:
     def __init__(self, state_node, color):
-        self.board = state_node.othello_logic.board
+        self.disks = state_node.othello_logic.disks[color]
         self.color = color
         """ Features that shown in the matrix below:
         [1, 2, 3, 4, 4, 3, 2, 1],
@@ -65,51 +168,22 @@ class Features:
         # todo other feature: num of moves and num of opponent moves
 
     def set_features(self):
-        """ find each feature according to board and color
+        """ find each feature according to disks of the color (number of disks in each region mask)
             then append them to feature_list """
-        for x in range(ROW_SIZE):
-            for y in range(COLUMN_SIZE):
-                if self.board[x][y] == self.color:
-                    self.point_difference += 1
-                    # Corner cells
-                    if is_corner(x, y, 0):
-                        self.corners += 1
-
-                    # Cells on the edges that are next to the corners
-                    if on_edge_and_not_corner(x, y, 1):
-                        self.edges_next_to_corner += 1
-
-                    # Cells on the edges that have most utility than others on the edge
-                    if on_edge_and_not_corner(x, y, 2):
-                        self.useful_edges += 1
-
-                    # Cells on the edges that are in two middle rows or colomns
-                    if on_edge_and_not_corner(x, y, 3):
-                        self.middle_edges += 1
-
-                    # Cells on the rows/columns that are next to the edge rows/columns
-                    # Here these cells are also corners
-                    if is_corner(x, y, 1):
-                        self.corners_of_one_before_edge += 1
-                    # Here these cells are not corners
-                    if inside_edge_and_not_corner(x, y, 1):
-                        self.one_before_edge_normal += 1
-
-                    # Cells inside the 4*4 square in the middle
-                    # Here these cells are the corners of this square
-                    if is_corner(x, y, 2):
-                        self.middle_square_corners += 1
-                    # Here these cells are not in the corner of this 4*4 square
-                    if inside_edge_and_not_corner(x, y, 2) | is_corner(x, y, 3):
-                        self.middle_square_normal += 1
-                else:  # it was an opponent disk
-                    self.point_difference -= 1
+        disks = self.disks
+        self.corners = (disks & CORNERS_MASK).bit_count()
+        self.edges_next_to_corner = (disks & EDGES_NEXT_TO_CORNER_MASK).bit_count()
+        self.useful_edges = (disks & USEFUL_EDGES_MASK).bit_count()
+        self.middle_edges = (disks & MIDDLE_EDGES_MASK).bit_count()
+        self.corners_of_one_before_edge = (disks & CORNERS_OF_ONE_BEFORE_EDGE_MASK).bit_count()
+        self.one_before_edge_normal = (disks & ONE_BEFORE_EDGE_NORMAL_MASK).bit_count()
+        self.middle_square_corners = (disks & MIDDLE_SQUARE_CORNERS_MASK).bit_count()
+        self.middle_square_normal = (disks & MIDDLE_SQUARE_NORMAL_MASK).bit_count()
+        # empty cells are counted as opponent disks too
+        self.point_difference = 2 * disks.bit_count() - NUM_OF_CELLS
 
         # negative features get a -1 coefficient when being inserted to the feature_list
-        self.feature_list = [self.corners, -self.edges_next_to_corner/NORMALIZATION_CONST8, self.useful_edges/NORMALIZATION_CONST8,
-                             self.middle_edges/NORMALIZATION_CONST8, -self.corners_of_one_before_edge,
-                             -self.one_before_edge_normal/NORMALIZATION_CONST12, self.middle_square_corners,
-                             self.middle_square_normal/NORMALIZATION_CONST12, self.point_difference/NORMALIZATION_CONST64]
+        self.feature_list = feature_list(disks)
 
     # Getter
     def get_features(self):
@@ -1,8 +1,14 @@
 import random
-import copy
+import time
 import src.Agent.Tree as Tree
+import src.Agent.Endgame as Endgame
+import src.Agent.Evaluation_cache as Evaluation_cache
 import src.Agent.Heuristic as Heuristic
+import src.Agent.Search_stats as Search_stats
+import src.Agent.Transposition as Transposition
 import src.Logic.Othello_logic as Othello_logic
+import src.Logic.Symmetry as Symmetry
+import src.Logic.Zobrist as Zobrist
 
 # Constant values
 MAX_VALUE = float('inf')  # +infinity
@@ -10,6 +16,14 @@ MIN_VALUE = float('-inf')  # -infinity
 MAX_DEPTH = 4  # TODO: may need to be changed(originally: 9 / for learn: 5)
 NUM_OF_FEATURES = 9  # todo: change
 CLOSE_TO_END_DEPTH = 64 - MAX_DEPTH
+BATCH_MIN_SIZE = 8  # children are scored with one numpy call if there are at least this many (faster than one by one)
+DEFAULT_TIME_BUDGET = 0.05  # seconds per move, suggested budget for iterative deepening
+ENDGAME_TIME_SHARE = 0.5  # part of the time budget of a move that the endgame solver may use
+
+
+# This Exception will raised when the time budget of a move is over in the middle of a search
+class SearchTimeout(Exception):
+    """ Time budget of the search is over """
 
 
 def opponent_color(color):
@@ -30,114 +44,390 @@ def opponent_color(color):
 
 class Minimax:
 
-    def __init__(self, othello_logic, weight_list):
+    def __init__(self, othello_logic, weight_list, table_size=Transposition.DEFAULT_SIZE, time_budget=None,
+                 endgame_empties=Endgame.ENDGAME_EMPTIES, search_depth=MAX_DEPTH, stats=None,
+                 opening_book=None, symmetric_table=False, cache_size=None,
+                 cache_eviction=Evaluation_cache.LRU, pattern_evaluator=None):
         self.othello_logic = othello_logic
+        # Pattern_evaluation.PatternEvaluator instance that scores the positions in place of the weight list,
+        # None to use the features of Heuristic
+        self.pattern_evaluator = pattern_evaluator
         self.weight_list = weight_list
+        self.weights_key = self.scores_key(weight_list)  # scores depend on the weights, so they are in the keys
+        self.transposition_table = Transposition.TranspositionTable(table_size)
+        self.time_budget = time_budget  # seconds per move, None means a fixed depth search (search_depth)
+        self.search_depth = search_depth  # depth of the fixed depth search
+        self.max_depth = search_depth  # depth of the current search (changes in iterative deepening)
+        self.deadline = None  # time.perf_counter() value that the current search must stop at
+        self.previous_best_move = None  # best move of the previous iteration, checked first in the root
+        self.child_scores = {}  # utility of each child (action -> utility) of the last sorted node
+        self.endgame_empties = endgame_empties  # solve the game exactly from this many empty cells, None to disable
+        self.endgame_solver = Endgame.EndgameSolver()
+        self.stats = stats  # Search_stats.SearchStats instance to collect statistics, None to collect nothing
+        self.completed_depth = 0  # depth of the last search that was completed (for stats)
+        self.opening_book = opening_book  # Opening_book.OpeningBook instance, None to always search
+        # key the transposition table by Symmetry.canonical_hash, so one entry covers the 8 symmetric positions
+        # (finding the canonical position costs more than the incremental Zobrist hash, so it's off by default)
+        self.symmetric_table = symmetric_table
+        # scores of evaluated positions (cache_size scores at most), None disables the cache; it pays off when the
+        # same positions are searched again (iterative deepening), in a single search few positions are evaluated twice
+        self.evaluation_cache = Evaluation_cache.EvaluationCache(cache_size, cache_eviction) if cache_size else None
 
-    def minimax_with_alpha_beta(self, state_node, color):
-        """ Minimax with alpha beta pruning """
-        (best_score, best_move) = self.max_alpha_beta(state_node, color, 0, MIN_VALUE, MAX_VALUE)  # Depth is zero here
-        # print("final: ", best_score, " ", best_move)
+    def minimax_with_alpha_beta(self, state_node, color, time_budget=None):
+        """ Minimax with alpha beta pruning
+        if a time budget (seconds) is given (or set for this instance) the search is deepened iteratively until the
+        time is over and the best move of the deepest completed iteration is returned
+        in the opening the move of the opening book is played if one is set and the position is in the book
+        near the end of the game (at most endgame_empties empty cells) the move is found by the endgame solver, with a
+        time budget the solver has ENDGAME_TIME_SHARE of it and the search uses the rest if the solver is stopped
+        a record of the move is added to self.stats if statistics are collected
+        """
+        if self.stats is None:
+            return self.find_move(state_node, color, time_budget)
+        start = time.perf_counter()
+        best_move = self.find_move(state_node, color, time_budget)
+        self.stats.end_move(self.completed_depth, start)
         return best_move
 
+    def find_move(self, state_node, color, time_budget):
+        """ Finds the move of minimax_with_alpha_beta """
+        if self.opening_book is not None:
+            disks = state_node.othello_logic.disks
+            book_move = self.opening_book.lookup(disks[color], disks[opponent_color(color)])
+            if book_move is not None:
+                self.completed_depth = 0
+                return book_move
+
+        if time_budget is None:
+            time_budget = self.time_budget
+        if self.endgame_empties is not None and self.empty_cells(state_node) <= self.endgame_empties:
+            start = time.perf_counter()
+            deadline = None if time_budget is None else start + time_budget * ENDGAME_TIME_SHARE
+            best_move = self.solve_endgame(state_node, color, deadline)
+            if best_move is not None:
+                self.completed_depth = self.empty_cells(state_node)
+                return best_move
+            if time_budget is not None:  # the solver was stopped or there are no moves, search in the remaining time
+                time_budget = max(0.0, time_budget - (time.perf_counter() - start))
+
+        self.transposition_table.new_search()
+        if time_budget is None:
+            self.max_depth = self.search_depth
+            self.previous_best_move = None
+            (best_score, best_move) = self.max_alpha_beta(state_node, color, 0, MIN_VALUE, MAX_VALUE)  # Depth is zero here
+            # print("final: ", best_score, " ", best_move)
+            self.completed_depth = self.search_depth
+            return best_move
+        return self.iterative_deepening(state_node, color, time_budget)
+
+    def iterative_deepening(self, state_node, color, time_budget):
+        """ Searches with depth 1, 2, ... until the time budget is over
+        each iteration starts with the best move of the previous one (and the transposition table of previous ones)
+        """
+        start = time.perf_counter()
+        self.deadline = start + time_budget
+        self.previous_best_move = None
+        self.completed_depth = 0
+        best_move = None
+        try:
+            # there is no need to go deeper than the number of empty cells
+            for depth in range(1, self.empty_cells(state_node) + 1):
+                iteration_start = time.perf_counter()
+                self.max_depth = depth
+                (best_score, move) = self.max_alpha_beta(state_node, color, 0, MIN_VALUE, MAX_VALUE)
+                if move is None:  # no moves to search
+                    break
+                best_move = move
+                self.previous_best_move = move
+                self.completed_depth = depth
+                # the next iteration takes longer than this one, don't start it if it can't be completed
+                now = time.perf_counter()
+                if self.deadline - now < now - iteration_start:
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+            self.max_depth = self.search_depth
+
+        if best_move is None:  # not even the first iteration is completed
+            actions = state_node.othello_logic.get_possible_moves(color)
+            if actions:
+                best_move = actions[0]
+        return best_move
+
+    def solve_endgame(self, state_node, color, deadline=None):
+        """ Finds the move with the best final disk difference for color (None if there are no moves or the solver
+        isn't done by the deadline) """
+        disks = state_node.othello_logic.disks
+        start = time.perf_counter()
+        nodes = self.endgame_solver.nodes
+        try:
+            (score, best_move) = self.endgame_solver.solve(disks[color], disks[opponent_color(color)],
+                                                           deadline=deadline)
+        except Endgame.SolverTimeout:
+            best_move = None
+        if self.stats is not None:
+            self.stats.endgame_nodes += self.endgame_solver.nodes - nodes
+            self.stats.add_time(Search_stats.ENDGAME, start)
+        return best_move
+
+    @staticmethod
+    def empty_cells(state_node):
+        """ Number of empty cells of the node """
+        return state_node.othello_logic.number_of_empty_cells()
+
+    def check_time(self):
+        """ Stops the search (raises SearchTimeout) if the time budget is over """
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
     def max_alpha_beta(self, state_node, color, depth, alpha, beta):
         """ Minimax with alpha beta pruning :part 1
         finds the best move and its best score for a max node
         """
+        self.check_time()
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
         # Stop diving when reaching to the specific depth
-        if depth == MAX_DEPTH or state_node.othello_logic.end_of_game():
-            return self.utility(state_node), None
+        if depth == self.max_depth or state_node.othello_logic.end_of_game():
+            return self.leaf(state_node)
+
+        # Use the result of a previous search of this position if it's deep enough and causes a cut
+        (key, symmetry) = self.node_key(state_node, color, True)
+        entry = self.transposition_table.probe(key)
+        if self.is_entry_usable(entry, depth, alpha, beta):
+            if stats is not None:
+                stats.table_cutoffs += 1
+            return entry[2], Symmetry.inverse_transform_move(entry[4], symmetry)
 
         # Get all possible actions for this color
         actions = state_node.othello_logic.get_possible_moves(color)
         # If there is no possible actions
         if not actions:
-            return self.utility(state_node), None
+            return self.leaf(state_node)
 
         # sort and select (three) most promising actions or select all actions if it's nearly end of the game
         actions = self.most_promising_actions(actions, state_node, True)
+        # if the children are leaves their utilities are already found while sorting the actions
+        leaf_scores = self.child_scores if depth + 1 == self.max_depth else None
+        # the best move of a previous search is checked first
+        if entry is not None:
+            actions = self.move_first(actions, Symmetry.inverse_transform_move(entry[4], symmetry))
+        # the best move of the previous iteration is checked first in the root
+        if depth == 0:
+            actions = self.move_first(actions, self.previous_best_move)
 
         best_score = MIN_VALUE
         best_move = None
+        alpha_bound = alpha
+        if stats is not None:
+            stats.interior_nodes += 1
         # check all promising actions and find the best move and its best score
         for action in actions:
-            new_node = self.next_node(action, state_node)
-            # Find alpha-beta for Min node (opponent player)
-            temp_tuple = self.min_alpha_beta(new_node, opponent_color(color), depth + 1, alpha, beta)
-            temp_score = temp_tuple[0]
+            if stats is not None:
+                stats.children += 1
+            if leaf_scores is not None:
+                temp_score = leaf_scores[action]
+                if stats is not None:
+                    stats.nodes += 1
+                    stats.leaves += 1
+            else:
+                new_node = self.next_node(action, state_node)
+                # Find alpha-beta for Min node (opponent player)
+                try:
+                    temp_tuple = self.min_alpha_beta(new_node, opponent_color(color), depth + 1, alpha, beta)
+                finally:  # the action is taken back even if the search is stopped
+                    self.previous_node(new_node)
+                temp_score = temp_tuple[0]
             # Update best score and move if needed
             if temp_score > best_score:
                 best_score = temp_score
                 best_move = action
             # Pruning, if possible
             if best_score >= beta:
-                return best_score, best_move
+                if stats is not None:
+                    stats.count_cutoff(True, action == actions[0])
+                break
             alpha = max(alpha, best_score)
+        self.store_node(key, depth, best_score, Symmetry.transform_move(best_move, symmetry), alpha_bound, beta)
         return best_score, best_move
 
     def min_alpha_beta(self, state_node, color, depth, alpha, beta):
         """ Minimax with alpha beta pruning :part 2
         finds the best move and its best score for a min node
         """
+        self.check_time()
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
         # Stop diving when reaching to the specific depth
-        if depth == MAX_DEPTH or state_node.othello_logic.end_of_game():
-            return self.utility(state_node), None
+        if depth == self.max_depth or state_node.othello_logic.end_of_game():
+            return self.leaf(state_node)
+
+        # Use the result of a previous search of this position if it's deep enough and causes a cut
+        (key, symmetry) = self.node_key(state_node, color, False)
+        entry = self.transposition_table.probe(key)
+        if self.is_entry_usable(entry, depth, alpha, beta):
+            if stats is not None:
+                stats.table_cutoffs += 1
+            return entry[2], Symmetry.inverse_transform_move(entry[4], symmetry)
 
         # Get all possible actions for this color
         actions = state_node.othello_logic.get_possible_moves(color)
 
         # If there is no possible actions
         if not actions:
-            return self.utility(state_node), None
+            return self.leaf(state_node)
 
         # sort and select three most promising actions or select all actions if it's nearly end of the game
         actions = self.most_promising_actions(actions, state_node, False)
+        # if the children are leaves their utilities are already found while sorting the actions
+        leaf_scores = self.child_scores if depth + 1 == self.max_depth else None
+        # the best move of a previous search is checked first
+        if entry is not None:
+            actions = self.move_first(actions, Symmetry.inverse_transform_move(entry[4], symmetry))
 
         best_score = MAX_VALUE
         best_move = None
+        beta_bound = beta
+        if stats is not None:
+            stats.interior_nodes += 1
         # check all promising actions and find the best move and its best score
         for action in actions:
-            new_node = self.next_node(action, state_node)
-            # Find alpha-beta for Max node (opponent player)
-            temp_tuple = self.max_alpha_beta(new_node, opponent_color(color), depth + 1, alpha, beta)
-            temp_score = temp_tuple[0]
+            if stats is not None:
+                stats.children += 1
+            if leaf_scores is not None:
+                temp_score = leaf_scores[action]
+                if stats is not None:
+                    stats.nodes += 1
+                    stats.leaves += 1
+            else:
+                new_node = self.next_node(action, state_node)
+                # Find alpha-beta for Max node (opponent player)
+                try:
+                    temp_tuple = self.max_alpha_beta(new_node, opponent_color(color), depth + 1, alpha, beta)
+                finally:  # the action is taken back even if the search is stopped
+                    self.previous_node(new_node)
+                temp_score = temp_tuple[0]
             # Update best score and move if needed
             if temp_score < best_score:
                 best_score = temp_score
                 best_move = action
             # Pruning, if possible
             if best_score <= alpha:
-                return best_score, best_move
+                if stats is not None:
+                    stats.count_cutoff(False, action == actions[0])
+                break
             beta = min(beta, best_score)
+        self.store_node(key, depth, best_score, Symmetry.transform_move(best_move, symmetry), alpha, beta_bound)
         return best_score, best_move
 
-    def utility(self, state_node):
-        """ Evaluates the utility of given state according to features """
-        total = 0
-        agent = Othello_logic.WHITE
-        player = Othello_logic.BLACK
-        # Evaluate the weighted score for color and add it to the total
-        features = Heuristic.Features(state_node, agent)
-        feature_list = features.get_features()
-        for i in range(0, NUM_OF_FEATURES):
-            total += self.weight_list[i] * feature_list[i]
-
-        # Evaluate the weighted score for opponent color and subtract it from the total
-        opponent_features = Heuristic.Features(state_node, player)
-        feature_list = opponent_features.get_features()
-        for i in range(0, NUM_OF_FEATURES):
-            total -= self.weight_list[i] * feature_list[i]
-
-        # Return the total weighted score
-        return total
+    def node_key(self, state_node, color, is_max):
+        """ Key of the node in the transposition table: position, color, node type and weights
+        returns (key, symmetry index), moves are stored in the table in the symmetric (canonical) position """
+        symmetry = Symmetry.IDENTITY
+        if self.symmetric_table:
+            disks = state_node.othello_logic.disks
+            (key, symmetry) = Symmetry.canonical_hash(disks[Othello_logic.BLACK], disks[Othello_logic.WHITE])
+            key ^= self.weights_key
+        else:
+            key = state_node.othello_logic.zobrist_hash ^ self.weights_key
+        if color == Othello_logic.WHITE:
+            key ^= Zobrist.TURN_KEY
+        if is_max:
+            key ^= Transposition.MAX_NODE_KEY
+        return key, symmetry
+
+    def is_entry_usable(self, entry, depth, alpha, beta):
+        """ checks if a transposition table entry can be returned instead of searching the node
+        (the root is always searched so that a move is returned) """
+        if entry is None or depth == 0 or entry[1] < self.max_depth - depth:
+            return False
+        bound = entry[3]
+        return ((bound == Transposition.EXACT) |
+                ((bound == Transposition.LOWER_BOUND) & (entry[2] >= beta)) |
+                ((bound == Transposition.UPPER_BOUND) & (entry[2] <= alpha)))
 
     @staticmethod
-    def next_node(action, state_node):
-        """ Gives a new node performing the given action on the given node """
-        new_othello_logic = copy.deepcopy(state_node.othello_logic)  # copy board info to another node
-        new_node = Tree.Node(new_othello_logic, state_node.depth + 1)  # Execute action on newly created board
-        new_othello_logic.move(action[0], action[1])
-        return new_node
+    def move_first(actions, move):
+        """ moves the given move (e.g. best move of a transposition table entry) to the front of the actions """
+        if move is None or move not in actions:
+            return actions
+        return [move] + [action for action in actions if action != move]
+
+    def store_node(self, key, depth, best_score, best_move, alpha, beta):
+        """ stores the result of a searched node with the bound type found from the (initial) alpha and beta """
+        if best_score >= beta:
+            bound = Transposition.LOWER_BOUND
+        elif best_score <= alpha:
+            bound = Transposition.UPPER_BOUND
+        else:
+            bound = Transposition.EXACT
+        self.transposition_table.store(key, self.max_depth - depth, best_score, bound, best_move)
+
+    def leaf(self, state_node):
+        """ Returns (utility, None) for a node that is not expanded """
+        if self.stats is not None:
+            self.stats.leaves += 1
+        return self.utility(state_node), None
+
+    def utility(self, state_node):
+        """ Evaluates the utility of given state according to features
+        (weighted features of the agent minus weighted features of the player, see Heuristic.evaluate, or the score
+        of the pattern evaluator)
+        the score is taken from the evaluation cache if the position is already evaluated with the same weights """
+        cache = self.evaluation_cache
+        if cache is not None:
+            key = self.evaluation_key(state_node.othello_logic.zobrist_hash)
+            util = cache.get(key)
+            if util is not None:
+                if self.stats is not None:
+                    self.stats.cache_hits += 1
+                return util
+        disks = state_node.othello_logic.disks
+        if self.stats is None:
+            util = self.evaluate(disks[Othello_logic.WHITE], disks[Othello_logic.BLACK])
+        else:
+            start = time.perf_counter()
+            util = self.evaluate(disks[Othello_logic.WHITE], disks[Othello_logic.BLACK])
+            self.stats.evaluations += 1
+            self.stats.add_time(Search_stats.EVALUATION, start)
+        if cache is not None:
+            cache.put(key, util)
+        return util
+
+    def evaluate(self, white, black):
+        """ Score of one position: Heuristic.evaluate with the weight list or the pattern evaluator """
+        if self.pattern_evaluator is None:
+            return Heuristic.evaluate(white, black, self.weight_list)
+        return self.pattern_evaluator.evaluate(white, black)
+
+    def evaluation_key(self, zobrist_hash):
+        """ Key of a position in the evaluation cache: the score depends on the disks and the weights only """
+        return zobrist_hash ^ self.weights_key
+
+    def next_node(self, action, state_node):
+        """ Gives a new node performing the given action on the given node
+        the action is made in place on the same othello_logic, previous_node must be called to take it back
+        """
+        if self.stats is None:
+            move_record = state_node.othello_logic.apply_move(action[0], action[1])
+            return Tree.Node(state_node.othello_logic, state_node.depth + 1, move_record)
+        start = time.perf_counter()
+        move_record = state_node.othello_logic.apply_move(action[0], action[1])
+        self.stats.add_time(Search_stats.EXPANSION, start)
+        return Tree.Node(state_node.othello_logic, state_node.depth + 1, move_record)
+
+    def previous_node(self, new_node):
+        """ Takes back the action that next_node performed to create new_node """
+        if self.stats is None:
+            new_node.othello_logic.undo_move(new_node.move_record)
+            return
+        start = time.perf_counter()
+        new_node.othello_logic.undo_move(new_node.move_record)
+        self.stats.add_time(Search_stats.EXPANSION, start)
 
     def most_promising_actions(self, actions, state_node, reverse):
         """ gets a list of actions and sorts the actions either with descending or ascending order based on the
@@ -148,6 +438,8 @@ class Minimax:
         final movements
         """
 
+        if self.stats is not None:
+            start = time.perf_counter()
         pairs = self.create_pairs_of_utility_action(actions, state_node)
         pairs.sort(reverse=reverse, key=self.cmp_utils)
         if state_node.depth < CLOSE_TO_END_DEPTH:
@@ -159,8 +451,9 @@ class Minimax:
             # if len(pairs) > 3:
             #     actions.append(pairs[3][1])
         else:
-            for pair in pairs:
-                actions.append(pair[1])
+            actions = [pair[1] for pair in pairs]
+        if self.stats is not None:
+            self.stats.add_time(Search_stats.ORDERING, start)
         return actions
 
     @staticmethod
@@ -170,13 +463,67 @@ class Minimax:
 
     def create_pairs_of_utility_action(self, actions, state_node):
         """ calculates utility function for every action and adds the actions and their corresponding utility value
-        to a list of pairs """
-        pairs = []
-        for action in actions:
-            new_node = self.next_node(action, state_node)
-            util = self.utility(new_node)
-            pairs.append((util, action))
-        return pairs
+        to a list of pairs
+        the children positions that are not in the evaluation cache are collected first and scored together
+        (see batch_utility) """
+        cache = self.evaluation_cache
+        utils = []
+        black_list = []
+        white_list = []
+        missing = []  # (index in utils, cache key) of the children that are scored
+        if cache is None:
+            for action in actions:
+                (black, white) = state_node.othello_logic.disks_after_move(action[0], action[1])
+                black_list.append(black)
+                white_list.append(white)
+        else:
+            for action in actions:
+                (black, white, zobrist_hash) = state_node.othello_logic.position_after_move(action[0], action[1])
+                key = self.evaluation_key(zobrist_hash)
+                util = cache.get(key)
+                if util is not None:
+                    utils.append(util)
+                    continue
+                missing.append((len(utils), key))
+                utils.append(None)
+                black_list.append(black)
+                white_list.append(white)
+        if self.stats is not None:
+            self.stats.cache_hits += len(actions) - len(black_list)
+            start = time.perf_counter()
+        if len(black_list) >= BATCH_MIN_SIZE:
+            scores = self.batch_utility(white_list, black_list).tolist()
+        else:
+            scores = [self.evaluate(white, black) for white, black in zip(white_list, black_list)]
+        if self.stats is not None:
+            self.stats.evaluations += len(scores)
+            self.stats.add_time(Search_stats.EVALUATION, start)
+        if cache is None:
+            utils = scores
+        else:
+            for (index, key), util in zip(missing, scores):
+                utils[index] = util
+                cache.put(key, util)
+        self.child_scores = dict(zip(actions, utils))
+        return list(zip(utils, actions))
+
+    def batch_utility(self, white_list, black_list, weights=None):
+        """ Evaluates the utility of many positions (given by their white and black disks) in one numpy call
+        weights can be a (M, 9) array of weight lists to score every position with every weight list at once
+        (the result is a (N, M) array then), the weight list (or the pattern evaluator) of this instance is used by
+        default """
+        if weights is None:
+            if self.pattern_evaluator is not None:
+                return self.pattern_evaluator.evaluate_batch(white_list, black_list)
+            weights = self.weight_list
+        return Heuristic.evaluate_batch(white_list, black_list, weights)
+
+    def scores_key(self, weight_list):
+        """ Key of the evaluation (weight list and pattern tables) that is mixed into the cached scores' keys """
+        if self.pattern_evaluator is None:
+            return Zobrist.weights_key(weight_list)
+        return Zobrist.weights_key(weight_list) ^ self.pattern_evaluator.key
 
     def set_weight_list(self, weight_list):
         self.weight_list = weight_list
+        self.weights_key = self.scores_key(weight_list)
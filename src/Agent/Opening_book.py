@@ -0,0 +1,194 @@
+"""
+    Opening book
+    moves of the first plies of games (self-play or imported game records) are counted for every position, positions
+    are keyed by Symmetry.canonical_hash, so all the symmetric positions share one entry
+    book file format (little endian): header (magic, version, number of entries) then four columns sorted by key:
+    keys (uint64), moves (uint8, cell index in the normalized position), games (uint32), points (uint32)
+    run from the repository root: python -m src.Agent.Opening_book --games 200 --output book.bin
+"""
+
+import argparse
+import bisect
+import random
+import struct
+from array import array
+import src.Agent.Endgame as Endgame
+import src.Logic.Bitboard as Bitboard
+import src.Logic.Game_record as Game_record
+import src.Logic.Othello_logic as Othello_logic
+import src.Logic.Symmetry as Symmetry
+from src.Genetics.Agent_vs_agent import AgentVsAgent
+from src.Genetics.Gene import Gene
+
+# Constant values
+BOOK_PLIES = 12  # movements of each game that are added to the book
+MIN_GAMES = 1  # a move must be played in at least this many games to be saved
+MAGIC = b'OBK1'
+VERSION = 1
+HEADER = struct.Struct('<4sHI')  # magic, version, number of entries
+WIN_POINTS, TIE_POINTS = (2, 1)  # the same as Gene
+MIN_WEIGHT, MAX_WEIGHT = (1, 200)  # range of random weights for self-play
+
+
+def notation_to_cell(move):
+    """ Converts a movement in the standard notation (e.g. 'f5': column f, row 5) to (row, col) """
+    return int(move[1]) - 1, ord(move[0].lower()) - ord('a')
+
+
+def cell_to_notation(row, col):
+    return chr(ord('a') + col) + str(row + 1)
+
+
+class OpeningBook:
+    """ Read-only book, the file is loaded at the first lookup """
+
+    def __init__(self, path):
+        self.path = path
+        self.keys = None
+        self.moves = None
+        self.games = None
+        self.points = None
+
+    def load(self):
+        with open(self.path, 'rb') as f:
+            (magic, version, size) = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("not an opening book file: " + str(self.path))
+            self.keys = array('Q')
+            self.keys.fromfile(f, size)
+            self.moves = array('B')
+            self.moves.fromfile(f, size)
+            self.games = array('I')
+            self.games.fromfile(f, size)
+            self.points = array('I')
+            self.points.fromfile(f, size)
+
+    def lookup(self, own, opponent):
+        """ Returns the book move (row, col) for 'own' to move or None if the position is not in the book
+        the move with the best average points is chosen (more games break ties) """
+        if self.keys is None:
+            self.load()
+        (key, symmetry) = Symmetry.canonical_hash(own, opponent)
+        i = bisect.bisect_left(self.keys, key)
+        best = None
+        while i < len(self.keys) and self.keys[i] == key:
+            candidate = (self.points[i] / self.games[i], self.games[i], self.moves[i])
+            if best is None or candidate[:2] > best[:2]:
+                best = candidate
+            i += 1
+        if best is None:
+            return None
+        # the move is saved in the normalized position, take the symmetry back
+        bit = Bitboard.inverse_transform(1 << best[2], symmetry)
+        if not bit & Bitboard.get_moves(own, opponent):  # a different position with the same key
+            return None
+        return Endgame.bit_to_cell(bit)
+
+    def __len__(self):
+        if self.keys is None:
+            self.load()
+        return len(self.keys)
+
+
+class BookBuilder:
+    """ Counts the games and points of every (normalized position, move) of the first plies of the added games """
+
+    def __init__(self, plies=BOOK_PLIES):
+        self.plies = plies
+        self.statistics = {}  # (key, move) -> [games, points]
+
+    def add_game(self, move_list, winner=None):
+        """ Adds the first plies of a game given as a list of (row, col)
+        winner is BLACK, WHITE or EMPTY (tie), if it's None the winner of the final position of move_list is used """
+        logic = Othello_logic.OthelloLogic()
+        movers = []
+        for row, col in move_list:
+            player_ch = Othello_logic.BLACK if logic.turn == Othello_logic.Player.BLACK.value else Othello_logic.WHITE
+            if len(movers) < self.plies:
+                movers.append((player_ch, logic.disks[player_ch],
+                               logic.disks[Othello_logic.WHITE if player_ch == Othello_logic.BLACK
+                                           else Othello_logic.BLACK], row * Bitboard.COLUMN_SIZE + col))
+            if not logic.apply_move(row, col)[2]:
+                raise Othello_logic.MovementError()
+        if winner is None:
+            winner = logic.find_winner()
+
+        for player_ch, own, opponent, cell in movers:
+            (key, symmetry) = Symmetry.canonical_hash(own, opponent)
+            move = Bitboard.transform(1 << cell, symmetry).bit_length() - 1
+            counters = self.statistics.setdefault((key, move), [0, 0])
+            counters[0] += 1
+            if winner == player_ch:
+                counters[1] += WIN_POINTS
+            elif winner == Othello_logic.EMPTY:
+                counters[1] += TIE_POINTS
+
+    def add_self_play_games(self, games, seed=None):
+        """ Plays agent vs agent games between random weight lists and adds them """
+        rand = random.Random(seed)
+        for i in range(games):
+            genes = [Gene([rand.randint(MIN_WEIGHT, MAX_WEIGHT) for j in range(len(Othello_logic.OPTIMUM_WEIGHTS))])
+                     for k in range(2)]
+            game = AgentVsAgent(genes[0], genes[1])
+            winner_gene = game.get_winner()
+            if winner_gene is None:
+                winner = Othello_logic.EMPTY
+            else:
+                winner = Othello_logic.BLACK if winner_gene is genes[0] else Othello_logic.WHITE
+            self.add_game(game.get_move_list(), winner)
+
+    def import_records(self, path):
+        """ Adds the games of a text file, one game per line: movements in the standard notation (e.g. f5d6c3)
+        and optionally the winner (b, w or _ for a tie) after a space """
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+                moves = [notation_to_cell(parts[0][i:i + 2]) for i in range(0, len(parts[0]), 2)]
+                self.add_game(moves, parts[1] if len(parts) > 1 else None)
+
+    def import_game_records(self, path):
+        """ Adds the games of a binary game record file (see Game_record) """
+        for moves, black_disks, white_disks, tag in Game_record.GameRecordReader(path):
+            if black_disks > white_disks:
+                winner = Othello_logic.BLACK
+            elif black_disks < white_disks:
+                winner = Othello_logic.WHITE
+            else:
+                winner = Othello_logic.EMPTY
+            self.add_game(Game_record.decode_moves(moves), winner)
+
+    def save(self, path, min_games=MIN_GAMES):
+        """ Writes the book file """
+        entries = sorted((key, move, games, points) for (key, move), (games, points) in self.statistics.items()
+                         if games >= min_games)
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+            for column, typecode in enumerate(('Q', 'B', 'I', 'I')):
+                array(typecode, [entry[column] for entry in entries]).tofile(f)
+        return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Builds an opening book")
+    parser.add_argument("--output", required=True, help="book file")
+    parser.add_argument("--games", type=int, default=0, help="number of self-play games")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the random weights of self-play")
+    parser.add_argument("--records", nargs="*", default=[], help="text files of game records")
+    parser.add_argument("--game-records", nargs="*", default=[], help="binary game record files (see Game_record)")
+    parser.add_argument("--plies", type=int, default=BOOK_PLIES, help="movements of each game in the book")
+    parser.add_argument("--min-games", type=int, default=MIN_GAMES, help="minimum games of a saved move")
+    arguments = parser.parse_args()
+
+    builder = BookBuilder(arguments.plies)
+    for path in arguments.records:
+        builder.import_records(path)
+    for path in arguments.game_records:
+        builder.import_game_records(path)
+    builder.add_self_play_games(arguments.games, arguments.seed)
+    print("entries:", builder.save(arguments.output, arguments.min_games))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+    Pattern based evaluation
+    the board is seen through patterns (edges, 3x3 corners, diagonals and 2x5 corner blocks in all their symmetric
+    places); the cells of a pattern make a base 3 index (0 empty, 1 agent disk, 2 player disk) into the weight table
+    of the pattern, and every game phase (by the number of disks) has its own tables
+    the score of a position is the sum of the weights of its pattern indices; the indices are gathered from the
+    bitboards with precomputed tables (a multiplication gathers a row, column or diagonal of a pattern to one byte,
+    which is looked up), or with one matrix product for many positions
+    the tables are trained from played games by least squares on the final disk difference (see
+    Genetics/Pattern_training)
+"""
+
+import functools
+import hashlib
+import numpy
+import src.Logic.Othello_logic as Othello_logic  # first, it imports Minimax (importing Minimax first is circular)
+import src.Agent.Heuristic as Heuristic
+import src.Logic.Bitboard as Bitboard
+import src.Logic.Symmetry as Symmetry
+
+# Constant values
+# cells (row, col) of every pattern in one of its places, the other places are its symmetric images
+PATTERNS = {
+    "edge": [(0, col) for col in range(8)],
+    "corner_3x3": [(row, col) for row in range(3) for col in range(3)],
+    "diagonal": [(i, i) for i in range(8)],
+    "corner_2x5": [(row, col) for row in range(2) for col in range(5)],
+}
+NUM_OF_PHASES = 6
+NUM_OF_CELLS = Bitboard.ROW_SIZE * Bitboard.COLUMN_SIZE
+EPOCHS = 30
+LEARNING_RATE = 0.5  # part of the mean error of its positions that a weight is moved by in one epoch
+REGULARIZATION = 50  # added to the number of positions of a weight, so weights of a few positions move less
+GATHER_SHIFT = 56  # the cells of a lookup are gathered to the highest byte of a product
+
+
+def pattern_places(cells):
+    """ Returns the places of a pattern (lists of cell indices in the order of the pattern cells), one for every
+    different set of cells among the symmetric images """
+    places = []
+    seen = set()
+    for symmetry in range(Symmetry.NUM_OF_SYMMETRIES):
+        place = [Bitboard.transform(Bitboard.square_bit(row, col), symmetry).bit_length() - 1 for row, col in cells]
+        if frozenset(place) not in seen:
+            seen.add(frozenset(place))
+            places.append(place)
+    return places
+
+
+def gather_multiplier(cells, targets):
+    """ Returns the multiplier that moves every cell to bit GATHER_SHIFT + its target in the product of the masked
+    disks (None if the cells get mixed up) """
+    shifts = [GATHER_SHIFT + target - cell for cell, target in zip(cells, targets)]
+    if len(set(targets)) < len(cells) or min(shifts) < 0:
+        return None
+    multiplier = sum(1 << shift for shift in set(shifts))
+    for pattern in range(1 << len(cells)):
+        disks = sum(1 << cell for k, cell in enumerate(cells) if pattern >> k & 1)
+        gathered = sum(1 << target for k, target in enumerate(targets) if pattern >> k & 1)
+        if (disks * multiplier >> GATHER_SHIFT) & 0xFF != gathered:
+            return None
+    return multiplier
+
+
+def place_lookups(place):
+    """ (mask, multiplier, table) lookups that gather the cells of a place: one for every row, one for every column
+    or one for all the cells (diagonals), whichever is the fewest; table[gathered byte] is the base 3 value of the
+    disks in the cells (1 for every disk, the player disks are counted twice) """
+    groupings = ({}, {}, {})  # cells by row (gathered by column), by column (gathered by row), all (by column)
+    for k, cell in enumerate(place):
+        (row, col) = divmod(cell, Bitboard.COLUMN_SIZE)
+        groupings[0].setdefault(row, []).append((k, cell, col))
+        groupings[1].setdefault(col, []).append((k, cell, row))
+        groupings[2].setdefault(0, []).append((k, cell, col))
+    best = None
+    for grouping in groupings:
+        lookups = []
+        for group in grouping.values():
+            multiplier = gather_multiplier([cell for k, cell, target in group], [target for k, cell, target in group])
+            if multiplier is None:
+                break
+            table = [0] * 256
+            for k, cell, target in group:
+                for byte in range(256):
+                    if byte >> target & 1:
+                        table[byte] += 3 ** k
+            lookups.append((sum(1 << cell for k, cell, target in group), multiplier, tuple(table)))
+        else:
+            if best is None or len(lookups) < len(best):
+                best = lookups
+    return tuple(best)
+
+
+def build_places():
+    """ Returns (places, offset of the table of each place, table size of a phase) """
+    places = []
+    offsets = []
+    size = 0
+    for cells in PATTERNS.values():
+        for place in pattern_places(cells):
+            places.append(place)
+            offsets.append(size)
+        size += 3 ** len(cells)
+    return places, offsets, size
+
+
+(PLACES, OFFSETS, TABLE_SIZE) = build_places()
+# for every place: (offset, lookups), used by the scalar evaluation
+PLACE_LOOKUPS = tuple((offset, place_lookups(place)) for place, offset in zip(PLACES, OFFSETS))
+# (64, places) matrix: the power of 3 of every cell in every place, used by the batch evaluation
+POWER_MATRIX = numpy.zeros((NUM_OF_CELLS, len(PLACES)), dtype=numpy.int32)  # int32 halves the memory of training
+for column, place in enumerate(PLACES):
+    for k, cell in enumerate(place):
+        POWER_MATRIX[cell, column] = 3 ** k
+OFFSET_ARRAY = numpy.array(OFFSETS, dtype=numpy.int32)
+
+
+def phase_of(disks):
+    """ Game phase of a position with the given number of disks """
+    return min(NUM_OF_PHASES - 1, max(0, disks - 4) * NUM_OF_PHASES // (NUM_OF_CELLS - 4))
+
+
+class PatternEvaluator:
+    """ Pattern weight tables: a (NUM_OF_PHASES, TABLE_SIZE) array, zeros if not given """
+
+    def __init__(self, weights=None):
+        self.weights = numpy.zeros((NUM_OF_PHASES, TABLE_SIZE)) if weights is None else numpy.asarray(weights, float)
+        self.update()
+
+    def update(self):
+        """ Must be called after the weights are changed """
+        self.tables = self.weights.tolist()  # list lookups are faster than numpy ones in the scalar evaluation
+        self.key = int.from_bytes(hashlib.blake2b(self.weights.tobytes(), digest_size=8).digest(), "little")
+
+    @classmethod
+    def load(cls, path):
+        with numpy.load(path) as data:
+            return cls(data["weights"])
+
+    def save(self, path):
+        numpy.savez_compressed(path, weights=self.weights)
+
+    def evaluate(self, agent_disks, player_disks):
+        """ Score of the position for the agent """
+        table = self.tables[phase_of((agent_disks | player_disks).bit_count())]
+        total = 0.0
+        for offset, lookups in PLACE_LOOKUPS:
+            index = offset
+            for mask, multiplier, table_of_byte in lookups:
+                index += (table_of_byte[(agent_disks & mask) * multiplier >> GATHER_SHIFT & 0xFF] +
+                          2 * table_of_byte[(player_disks & mask) * multiplier >> GATHER_SHIFT & 0xFF])
+            total += table[index]
+        return total
+
+    def evaluate_batch(self, agent_disks, player_disks):
+        """ Scores N positions in one call, the same as evaluate for each pair of (agent_disks[i], player_disks[i]) """
+        (phases, indices) = pattern_indices(agent_disks, player_disks)
+        terms = self.weights[phases[:, None], indices]
+        return numpy.cumsum(terms, axis=1)[:, -1]  # added up in the same order as evaluate
+
+    def train(self, agent_disks, player_disks, targets, epochs=EPOCHS, learning_rate=LEARNING_RATE,
+              regularization=REGULARIZATION):
+        """ Fits the weights to the targets (scores of the positions for the agent) by gradient descent on the
+        squared error, every weight is moved by learning_rate times the summed error of the positions it's used in
+        divided by (number of those positions + regularization) and by the number of places;
+        returns the root mean square error of every epoch """
+        (phases, indices) = pattern_indices(agent_disks, player_disks)
+        flat = (phases[:, None] * TABLE_SIZE + indices).ravel()  # indices of the used weights in the flat array
+        targets = numpy.asarray(targets, dtype=float)
+        weights = self.weights.reshape(-1)
+        counts = numpy.bincount(flat, minlength=weights.size)
+        step = learning_rate / len(PLACES) / numpy.maximum(counts + regularization, 1)
+        errors_list = []
+        for epoch in range(epochs):
+            errors = targets - weights[flat].reshape(len(targets), -1).sum(axis=1)
+            weights += step * numpy.bincount(flat, weights=numpy.repeat(errors, len(PLACES)), minlength=weights.size)
+            errors_list.append(float(numpy.sqrt(numpy.mean(errors ** 2))))
+        self.update()
+        return errors_list
+
+
+@functools.lru_cache(maxsize=None)
+def load_evaluator(path):
+    """ PatternEvaluator of a weights file, loaded once per process """
+    return PatternEvaluator.load(path)
+
+
+def pattern_indices(agent_disks, player_disks):
+    """ Returns (phases (N,), indices (N, places) into the table of a phase) of N positions """
+    agent_cells = Heuristic.disks_to_cells(agent_disks).astype(numpy.int32)
+    player_cells = Heuristic.disks_to_cells(player_disks).astype(numpy.int32)
+    indices = (agent_cells + 2 * player_cells) @ POWER_MATRIX + OFFSET_ARRAY
+    disks = (agent_cells + player_cells).sum(axis=1)
+    phases = numpy.minimum(NUM_OF_PHASES - 1, numpy.maximum(0, disks - 4) * NUM_OF_PHASES // (NUM_OF_CELLS - 4))
+    return phases, indices
@@ -0,0 +1,90 @@
+"""
+    Statistics of the Minimax search
+    an instance is given to Minimax (minimax.stats) to collect node counts, cutoffs, branching factor and the time of
+    each phase of the search; without an instance (minimax.stats is None) nothing is collected
+"""
+
+import time
+
+# Constant values
+COUNTERS = ("nodes",  # max and min nodes visited
+            "leaves",  # nodes that got a static score (utility) instead of being expanded
+            "evaluations",  # positions scored by the heuristic (leaves and children scored for ordering)
+            "cache_hits",  # positions whose score was found in the evaluation cache instead
+            "interior_nodes",  # nodes whose children were searched
+            "children",  # children searched in interior nodes
+            "beta_cutoffs",  # cuts in max nodes
+            "alpha_cutoffs",  # cuts in min nodes
+            "first_move_cutoffs",  # cuts made by the first searched child
+            "table_cutoffs",  # nodes answered by the transposition table
+            "endgame_nodes")  # nodes searched by the endgame solver
+# phases of the search that are timed, ordering includes the evaluation of the children
+SEARCH = "search"
+ORDERING = "ordering"
+EVALUATION = "evaluation"
+EXPANSION = "expansion"
+ENDGAME = "endgame"
+PHASES = (SEARCH, ORDERING, EVALUATION, EXPANSION, ENDGAME)
+
+
+def derived_stats(record):
+    """ Adds cutoff rates and branching factors to a record of counters """
+    cutoffs = record["beta_cutoffs"] + record["alpha_cutoffs"]
+    record["cutoff_rate"] = cutoffs / record["interior_nodes"] if record["interior_nodes"] else 0.0
+    record["first_move_cutoff_rate"] = record["first_move_cutoffs"] / cutoffs if cutoffs else 0.0
+    record["average_branching"] = record["children"] / record["interior_nodes"] if record["interior_nodes"] else 0.0
+    # the branching factor of a uniform tree with the same number of nodes and depth
+    depth = record.get("depth", 0)
+    record["effective_branching_factor"] = record["nodes"] ** (1 / depth) if depth and record["nodes"] else 0.0
+    return record
+
+
+class SearchStats:
+    """ Counters and phase times of the current move, and the records of the previous moves of the game """
+
+    def __init__(self):
+        self.moves = []  # one record (dictionary) for each move
+        self.times = {}
+        self.reset_move()
+
+    def reset_move(self):
+        """ Sets all the counters and times of the current move to zero """
+        for counter in COUNTERS:
+            setattr(self, counter, 0)
+        self.times = dict.fromkeys(PHASES, 0.0)
+
+    def add_time(self, phase, start):
+        """ Adds the time passed since start (a time.perf_counter() value) to the given phase """
+        self.times[phase] += time.perf_counter() - start
+
+    def count_cutoff(self, is_max, first_move):
+        if is_max:
+            self.beta_cutoffs += 1
+        else:
+            self.alpha_cutoffs += 1
+        if first_move:
+            self.first_move_cutoffs += 1
+
+    def end_move(self, depth, start):
+        """ Saves the record of the current move (searched 'depth' levels deep, started at 'start') and returns it """
+        self.add_time(SEARCH, start)
+        record = {counter: getattr(self, counter) for counter in COUNTERS}
+        record["depth"] = depth
+        record.update({phase + "_seconds": seconds for phase, seconds in self.times.items()})
+        derived_stats(record)
+        self.moves.append(record)
+        self.reset_move()
+        return record
+
+    def game_summary(self):
+        """ Sum of the counters and times of all the moves of the game """
+        summary = {counter: sum(record[counter] for record in self.moves) for counter in COUNTERS}
+        for phase in PHASES:
+            summary[phase + "_seconds"] = sum(record[phase + "_seconds"] for record in self.moves)
+        summary["moves"] = len(self.moves)
+        derived_stats(summary)  # there is no single depth for a game, so no effective branching factor
+        return summary
+
+    def new_game(self):
+        self.moves = []
+        self.reset_move()
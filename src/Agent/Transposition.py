@@ -0,0 +1,73 @@
+"""
+    Transposition table for the Minimax search
+    a fixed number of slots indexed by the low bits of the position key, every slot keeps one entry:
+    (key, depth, score, bound, best move, search number)
+"""
+
+# Constant values
+DEFAULT_SIZE = 1 << 16  # number of slots (must be a power of two)
+EXACT = 0  # score is the exact value of the node
+LOWER_BOUND = 1  # a cut happened in a max node, the real value is >= score
+UPPER_BOUND = 2  # a cut happened in a min node, the real value is <= score
+MAX_NODE_KEY = 0x9E3779B97F4A7C15  # mixed into the key of max nodes (max and min nodes have different values)
+
+
+class TranspositionTable:
+    """ Bounded table of searched positions
+    replacement policy: an entry is replaced by another position if the slot was filled in an older search
+    (minimax_with_alpha_beta call) or if the new position is searched at least as deep
+    """
+
+    def __init__(self, size=DEFAULT_SIZE):
+        if size <= 0 or size & (size - 1):
+            raise ValueError("size of the transposition table must be a power of two")
+        self.size = size
+        self.slots = [None] * size
+        self.search_number = 0
+        # counters
+        self.hits = 0  # the position was found
+        self.misses = 0  # the position was not found
+        self.collisions = 0  # the position was not found because the slot keeps another position
+        self.stores = 0
+        self.replacements = 0  # another position was removed from its slot
+
+    def new_search(self):
+        """ Called at the beginning of each search, entries of previous searches are replaced first """
+        self.search_number += 1
+
+    def probe(self, key):
+        """ Returns the entry of the given key or None """
+        entry = self.slots[key & (self.size - 1)]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        if entry is not None:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, score, bound, best_move):
+        """ Stores the result of searching the position with given key 'depth' levels deep """
+        index = key & (self.size - 1)
+        entry = self.slots[index]
+        if entry is not None and entry[0] != key:
+            if entry[5] == self.search_number and entry[1] > depth:
+                return  # keep the deeper entry of the current search
+            self.replacements += 1
+        self.slots[index] = (key, depth, score, bound, best_move, self.search_number)
+        self.stores += 1
+
+    def clear(self):
+        self.slots = [None] * self.size
+
+    def get_stats(self):
+        """ Returns the counters of the table and the number of filled slots """
+        probes = self.hits + self.misses
+        return {"size": self.size,
+                "filled": self.size - self.slots.count(None),
+                "hits": self.hits,
+                "misses": self.misses,
+                "collisions": self.collisions,
+                "stores": self.stores,
+                "replacements": self.replacements,
+                "hit_rate": self.hits / probes if probes else 0.0}
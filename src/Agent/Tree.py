@@ -4,7 +4,8 @@ class Tree:
 
 
 class Node:
-    def __init__(self, othello_logic, depth):
+    def __init__(self, othello_logic, depth, move_record=None):
         self.othello_logic = othello_logic
         self.depth = depth
+        self.move_record = move_record  # the movement that led to this node (used to take it back)
 
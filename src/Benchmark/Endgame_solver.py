@@ -0,0 +1,41 @@
+"""
+    Endgame solver benchmark
+    solves a fixed set of endgame positions and reports the nodes per second and the time to solve each of them
+    run from the repository root: python -m src.Benchmark.Endgame_solver
+"""
+
+import time
+import src.Agent.Endgame as Endgame
+import src.Logic.Bitboard as Bitboard
+
+# (disks of the player to move, disks of the opponent), collected from random games with a fixed seed
+POSITIONS = (
+    (0x0600306419153910, 0x38FECF9AE6EA46E6),  # 8 empties
+    (0xBE6C04007818863F, 0x0103FBFF87473900),  # 8 empties
+    (0x000101D9D03D0301, 0xA078FE262FC2FCFC),  # 10 empties
+    (0x727A0045F25B8C16, 0x8101FFBA0C047341),  # 10 empties
+    (0x785C0B970345A601, 0x87837468FC380038),  # 12 empties
+    (0x701050E4D0492074, 0x0F070F192F36DE81),  # 12 empties
+)
+
+
+def main():
+    total_nodes = 0
+    total_time = 0
+    for mode in (Endgame.EXACT_SCORE, Endgame.WIN_LOSS_DRAW):
+        print("mode:", mode)
+        for own, opponent in POSITIONS:
+            solver = Endgame.EndgameSolver()  # a new solver, so the hash table is empty
+            start = time.perf_counter()
+            (score, best_move) = solver.solve(own, opponent, mode)
+            elapsed = time.perf_counter() - start
+            total_nodes += solver.nodes
+            total_time += elapsed
+            print("  empties: {0:2d}  score: {1:3d}  move: {2}  nodes: {3:7d}  time: {4:.3f}s  nodes/sec: {5:.0f}".format(
+                64 - Bitboard.popcount(own | opponent), score, best_move, solver.nodes, elapsed,
+                solver.nodes / elapsed))
+    print("total nodes/sec: {0:.0f}".format(total_nodes / total_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+    Move generation benchmark
+    compares the bitboard move generation of OthelloLogic with the previous
+    list-of-lists implementation (kept here as a reference) on the same positions
+    and the ray table flips of Bitboard.get_flips with the previous shift by shift walk and with line tables
+    (flips of a row, column or diagonal looked up by its occupancy, kept here because they are slower on the
+    possible movements, which are the only flips the engine computes)
+    run from the repository root: python -m src.Benchmark.Move_generation
+"""
+
+import random
+import time
+import src.Logic.Othello_logic as Othello_logic
+import src.Logic.Bitboard as Bitboard
+
+# Constant values
+NUM_OF_GAMES = 20  # random games used to collect the positions
+SEED = 2020
+REPEAT = 5  # every position is generated this many times per measurement
+DIR_LIST = [[0, 1], [0, -1], [1, 0], [1, 1], [1, -1], [-1, 0], [-1, 1], [-1, -1]]
+LINE_SHIFT = 56  # the cells of a line are gathered to the highest byte
+POWERS_OF_3 = tuple(sum(3 ** k for k in range(8) if pattern >> k & 1) for pattern in range(256))
+
+
+def legacy_check_direction(board, row, col, x_dir, y_dir, player_ch, opponent_ch):
+    """ Previous cell by cell walk in one direction (without making the moves) """
+    x = row + x_dir
+    y = col + y_dir
+    first_time = True
+    while -1 < x < Othello_logic.ROW_SIZE and -1 < y < Othello_logic.COLUMN_SIZE:
+        if first_time:
+            first_time = False
+            if board[x][y] != opponent_ch:
+                return False
+        else:
+            if board[x][y] == Othello_logic.EMPTY:
+                return False
+            elif board[x][y] == player_ch:
+                return True
+        x += x_dir
+        y += y_dir
+    return False
+
+
+def legacy_possible_moves(board, player_ch):
+    """ Previous implementation of get_possible_moves: checks all 8 directions for all 64 cells """
+    opponent_ch = Othello_logic.BLACK if player_ch == Othello_logic.WHITE else Othello_logic.WHITE
+    moves = []
+    for x in range(Othello_logic.ROW_SIZE):
+        for y in range(Othello_logic.COLUMN_SIZE):
+            if board[x][y] == Othello_logic.EMPTY:
+                for direction in DIR_LIST:
+                    if legacy_check_direction(board, x, y, direction[0], direction[1], player_ch, opponent_ch):
+                        moves.append((x, y))
+                        break
+    return moves
+
+
+def legacy_get_flips(own, opponent, bit):
+    """ Previous get_flips: walks every direction cell by cell with shifts """
+    flips = 0
+    for amount, mask in Bitboard.DIRECTIONS:
+        line = 0
+        cell = Bitboard.shift(bit, amount, mask)
+        while cell & opponent:
+            line |= cell
+            cell = Bitboard.shift(cell, amount, mask)
+        if cell & own:
+            flips |= line
+    return flips
+
+
+def line_flips(length, position, own, opponent):
+    """ Flips of a movement to 'position' in a line of the given length (own and opponent are patterns of the line) """
+    flips = 0
+    for step in (1, -1):
+        line = 0
+        k = position + step
+        while 0 <= k < length and opponent >> k & 1:
+            line |= 1 << k
+            k += step
+        if 0 <= k < length and own >> k & 1:
+            flips |= line
+    return flips
+
+
+def line_multiplier(cells):
+    """ Returns the multiplier that gathers the cells of a line in the given order (None if there isn't any) """
+    lowest = min(cells)
+    shifts = {LINE_SHIFT + k - (cell - lowest) for k, cell in enumerate(cells)}
+    if min(shifts) < 0:
+        return None
+    multiplier = sum(1 << shift for shift in shifts)
+    for pattern in range(1 << len(cells)):
+        bits = sum(1 << cells[k] for k in range(len(cells)) if pattern >> k & 1)
+        if (bits >> lowest) * multiplier >> LINE_SHIFT & 0xFF != pattern:
+            return None
+    return multiplier
+
+
+def build_line_tables():
+    """ For every cell: (mask, lowest index, multiplier, flip table, scatter table) of the lines through it with
+    at least 3 cells; ((bits & mask) >> lowest index) * multiplier >> LINE_SHIFT gathers the line to a pattern,
+    the flip table is indexed by the base 3 value of (own, opponent) patterns and scatter maps a pattern back to cells """
+    tables = {}
+    result = []
+    for index in range(Othello_logic.ROW_SIZE * Othello_logic.COLUMN_SIZE):
+        (row, col) = divmod(index, Othello_logic.COLUMN_SIZE)
+        lines = ([row * 8 + k for k in range(8)], [k * 8 + col for k in range(8)],
+                 [k * 8 + k - row + col for k in range(8) if 0 <= k - row + col < 8],
+                 [k * 8 + row + col - k for k in range(8) if 0 <= row + col - k < 8])
+        entries = []
+        for cells in lines:
+            if len(cells) < 3:
+                continue
+            multiplier = line_multiplier(cells)
+            if multiplier is None:
+                cells = cells[::-1]
+                multiplier = line_multiplier(cells)
+            (length, position, lowest) = (len(cells), cells.index(index), min(cells))
+            if (length, position) not in tables:
+                table = [0] * 3 ** 8
+                for own in range(1 << length):
+                    for opponent in range(1 << length):
+                        if not own & opponent and not (own | opponent) >> position & 1:
+                            table[POWERS_OF_3[own] + 2 * POWERS_OF_3[opponent]] = line_flips(length, position, own,
+                                                                                              opponent)
+                tables[length, position] = table
+            scatter = [sum(1 << cells[k] for k in range(length) if pattern >> k & 1) for pattern in range(256)]
+            entries.append((sum(1 << cell for cell in cells), lowest, multiplier, tables[length, position], scatter))
+        result.append(tuple(entries))
+    return tuple(result)
+
+
+def line_table_flips(own, opponent, bit, line_tables):
+    """ get_flips with the line tables """
+    flips = 0
+    for mask, lowest, multiplier, table, scatter in line_tables[bit.bit_length() - 1]:
+        own_pattern = ((own & mask) >> lowest) * multiplier >> LINE_SHIFT & 0xFF
+        opponent_pattern = ((opponent & mask) >> lowest) * multiplier >> LINE_SHIFT & 0xFF
+        flips |= scatter[table[POWERS_OF_3[own_pattern] + 2 * POWERS_OF_3[opponent_pattern]]]
+    return flips
+
+
+def collect_positions():
+    """ Plays random games with a fixed seed and returns every (logic, player) position of them """
+    rand = random.Random(SEED)
+    positions = []
+    for i in range(NUM_OF_GAMES):
+        logic = Othello_logic.OthelloLogic()
+        while not logic.end_of_game():
+            player_ch = Othello_logic.BLACK if logic.turn == Othello_logic.Player.BLACK.value else Othello_logic.WHITE
+            positions.append((dict(logic.disks), player_ch))
+            row, col = rand.choice(list(logic.get_possible_moves(player_ch)))
+            logic.move(row, col)
+    return positions
+
+
+def measure(function, arguments):
+    """ Returns the number of move generations per second for the given function """
+    start = time.perf_counter()
+    for i in range(REPEAT):
+        for argument in arguments:
+            function(*argument)
+    return REPEAT * len(arguments) / (time.perf_counter() - start)
+
+
+def main():
+    positions = collect_positions()
+    boards = [(Bitboard.to_board(disks[Othello_logic.BLACK], disks[Othello_logic.WHITE], Othello_logic.BLACK,
+                                 Othello_logic.WHITE, Othello_logic.EMPTY), player_ch)
+              for disks, player_ch in positions]
+    bitboards = [(disks[player_ch], disks[Othello_logic.BLACK if player_ch == Othello_logic.WHITE
+                                          else Othello_logic.WHITE])
+                 for disks, player_ch in positions]
+
+    # both implementations should find the same moves
+    for (board, player_ch), (own, opponent) in zip(boards, bitboards):
+        assert legacy_possible_moves(board, player_ch) == list(Bitboard.iterate_cells(Bitboard.get_moves(own, opponent)))
+
+    legacy = measure(legacy_possible_moves, boards)
+    bitboard = measure(Bitboard.get_moves, bitboards)
+    bitboard_list = measure(lambda own, opponent: list(Bitboard.iterate_cells(Bitboard.get_moves(own, opponent))),
+                            bitboards)
+    print("positions:                 ", len(positions))
+    print("list-of-lists (moves/sec): ", "{0:.0f}".format(legacy))
+    print("bitboard mask (moves/sec): ", "{0:.0f}".format(bitboard), "x{0:.1f}".format(bitboard / legacy))
+    print("bitboard list (moves/sec): ", "{0:.0f}".format(bitboard_list), "x{0:.1f}".format(bitboard_list / legacy))
+
+    # flips of every possible movement and of every empty cell
+    line_tables = build_line_tables()
+    movements = [(own, opponent, bit) for own, opponent in bitboards
+                 for bit in (Bitboard.square_bit(row, col) for row, col in
+                             Bitboard.iterate_cells(~(own | opponent) & Bitboard.FULL_BOARD))]
+    for own, opponent, bit in movements:
+        assert Bitboard.get_flips(own, opponent, bit) == legacy_get_flips(own, opponent, bit) == \
+            line_table_flips(own, opponent, bit, line_tables)
+    possible = [movement for movement in movements if Bitboard.get_flips(*movement)]
+    for name, arguments in (("possible movements", possible), ("empty cells", movements)):
+        walk = measure(legacy_get_flips, arguments)
+        rays = measure(Bitboard.get_flips, arguments)
+        lines = measure(lambda own, opponent, bit: line_table_flips(own, opponent, bit, line_tables), arguments)
+        print("flips of", name + ":", len(arguments))
+        print("  shift walk (flips/sec):  ", "{0:.0f}".format(walk))
+        print("  ray tables (flips/sec):  ", "{0:.0f}".format(rays), "x{0:.1f}".format(rays / walk))
+        print("  line tables (flips/sec): ", "{0:.0f}".format(lines), "x{0:.1f}".format(lines / walk))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+    Fixed corpus of positions for the benchmarks
+    (black disks, white disks, turn) collected from random games with a fixed seed, the player to move has moves
+"""
+
+from src.Logic.Othello_logic import Player
+
+OPENING_POSITIONS = (
+    (0x00000008100E0000, 0x0004041408000000, Player.BLACK.value),  # 54 empties
+    (0x0000002828582000, 0x0000201010000000, Player.WHITE.value),  # 53 empties
+    (0x000020E00C000000, 0x0000181810200000, Player.BLACK.value),  # 52 empties
+    (0x0010181020440000, 0x000040281C000000, Player.WHITE.value),  # 51 empties
+    (0x0004081060000000, 0x00201008183C0000, Player.BLACK.value),  # 50 empties
+    (0x000000580C201008, 0x00004020101C0420, Player.BLACK.value),  # 48 empties
+)
+MIDGAME_POSITIONS = (
+    (0x0088480422030200, 0x000010785C1C2C4C, Player.BLACK.value),  # 36 empties
+    (0x040210F85B200808, 0x08050E0604881420, Player.BLACK.value),  # 34 empties
+    (0x002C5A0F0C070305, 0x0000247030301408, Player.BLACK.value),  # 32 empties
+    (0xA05828303818003A, 0x0020100A07073F00, Player.BLACK.value),  # 30 empties
+    (0x01007E5A0146C448, 0x0E0A0120FE281000, Player.WHITE.value),  # 27 empties
+    (0x040C0424541E3C50, 0x3833391B2B600000, Player.BLACK.value),  # 24 empties
+)
+ENDGAME_POSITIONS = (
+    (0x10450418DC200000, 0x60303BE7231F3F3F, Player.BLACK.value),  # 16 empties
+    (0x5E2E120638302824, 0x8151ED79474F4040, Player.WHITE.value),  # 15 empties
+    (0xF440EAC49A0C3E41, 0x023E143B61B0001E, Player.BLACK.value),  # 14 empties
+    (0x1CB8908286F8B83C, 0xC1426C7878070702, Player.WHITE.value),  # 13 empties
+    (0x3C7A23670F172F4D, 0x0180DC98B0C89000, Player.BLACK.value),  # 12 empties
+    (0x1DFE643B2D8E0605, 0xE0019A44507060F0, Player.BLACK.value),  # 12 empties
+)
+
+POSITION_SETS = {"opening": OPENING_POSITIONS, "midgame": MIDGAME_POSITIONS, "endgame": ENDGAME_POSITIONS}
@@ -0,0 +1,147 @@
+"""
+    Benchmark suite of the engine
+    measures move generation, evaluation, Minimax search at fixed depths and full agent vs agent games on the fixed
+    positions of Positions.py and writes the results as JSON, so engine changes can be compared
+    run from the repository root: python -m src.Benchmark.Search_suite --output results.json
+"""
+
+import argparse
+import json
+import platform
+import time
+import src.Agent.Heuristic as Heuristic
+import src.Agent.Search_stats as Search_stats
+import src.Agent.Tree as Tree
+import src.Benchmark.Positions as Positions
+import src.Logic.Bitboard as Bitboard
+import src.Logic.Othello_logic as Othello_logic
+from src.Genetics.Agent_vs_agent import AgentVsAgent
+from src.Genetics.Gene import Gene
+
+# Constant values
+DEFAULT_DEPTHS = (1, 2, 3, 4)
+DEFAULT_GAMES = 2
+REPEAT = 200  # every position is used this many times in move generation and evaluation measurements
+GAME_WEIGHTS = (Othello_logic.OPTIMUM_WEIGHTS, [97, 113, 49, 159, 153, 38, 128, 104, 3])
+
+
+def player_color(turn):
+    return Othello_logic.BLACK if turn == Othello_logic.Player.BLACK.value else Othello_logic.WHITE
+
+
+def all_positions():
+    return [position for positions in Positions.POSITION_SETS.values() for position in positions]
+
+
+def load_logic(position):
+    """ Returns an OthelloLogic in the given position (the endgame solver is disabled to measure the search) """
+    logic = Othello_logic.OthelloLogic()
+    logic.load_position(*position)
+    logic.minimax.endgame_empties = None
+    return logic
+
+
+def measure_move_generation():
+    """ Move generation on bitboards (moves/sec) and the list of moves of OthelloLogic (calls/sec) """
+    positions = all_positions()
+    bitboards = [(black, white) if player_color(turn) == Othello_logic.BLACK else (white, black)
+                 for black, white, turn in positions]
+    start = time.perf_counter()
+    for i in range(REPEAT):
+        for own, opponent in bitboards:
+            Bitboard.get_moves(own, opponent)
+    bitboard_rate = REPEAT * len(bitboards) / (time.perf_counter() - start)
+
+    logics = [(load_logic(position), player_color(position[2])) for position in positions]
+    start = time.perf_counter()
+    for i in range(REPEAT):
+        for logic, color in logics:
+            logic.moves[color] = None  # OthelloLogic keeps the moves of a position, so they are found again every time
+            logic.get_possible_moves(color)
+    list_rate = REPEAT * len(logics) / (time.perf_counter() - start)
+    return {"positions": len(positions), "bitboard_per_sec": bitboard_rate, "possible_moves_per_sec": list_rate}
+
+
+def measure_evaluation():
+    """ Heuristic evaluation one by one and in one batch (boards/sec) """
+    positions = all_positions()
+    white_list = [white for black, white, turn in positions]
+    black_list = [black for black, white, turn in positions]
+    weights = Othello_logic.OPTIMUM_WEIGHTS
+
+    start = time.perf_counter()
+    for i in range(REPEAT):
+        for white, black in zip(white_list, black_list):
+            Heuristic.evaluate(white, black, weights)
+    scalar_rate = REPEAT * len(positions) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    Heuristic.evaluate_batch(white_list * REPEAT, black_list * REPEAT, weights)
+    batch_rate = REPEAT * len(positions) / (time.perf_counter() - start)
+    return {"positions": len(positions), "scalar_per_sec": scalar_rate, "batch_per_sec": batch_rate}
+
+
+def measure_search(depths):
+    """ Time of minimax_with_alpha_beta for every position set and depth """
+    results = []
+    for depth in depths:
+        for phase, positions in Positions.POSITION_SETS.items():
+            total = 0
+            moves = []
+            stats = Search_stats.SearchStats()
+            for position in positions:
+                logic = load_logic(position)
+                logic.minimax.search_depth = depth
+                logic.minimax.stats = stats
+                start = time.perf_counter()
+                move = logic.minimax.minimax_with_alpha_beta(Tree.Node(logic, 0), player_color(position[2]))
+                total += time.perf_counter() - start
+                moves.append(list(move))
+            summary = stats.game_summary()
+            results.append({"phase": phase, "depth": depth, "positions": len(positions), "seconds": total,
+                            "ms_per_move": 1000 * total / len(positions), "nodes": summary["nodes"],
+                            "nodes_per_sec": summary["nodes"] / total, "cutoff_rate": summary["cutoff_rate"],
+                            "moves": moves})
+    return results
+
+
+def measure_games(games):
+    """ Full agent vs agent games (games/sec) """
+    start = time.perf_counter()
+    winners = []
+    for i in range(games):
+        genes = (Gene(list(GAME_WEIGHTS[i % 2])), Gene(list(GAME_WEIGHTS[(i + 1) % 2])))
+        winner = AgentVsAgent(genes[0], genes[1]).get_winner()
+        winners.append(None if winner is None else genes.index(winner))
+    elapsed = time.perf_counter() - start
+    return {"games": games, "seconds": elapsed, "games_per_sec": games / elapsed, "winners": winners}
+
+
+def run(depths=DEFAULT_DEPTHS, games=DEFAULT_GAMES):
+    """ Runs all the measurements and returns the results as a dictionary """
+    return {"python": platform.python_version(),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "move_generation": measure_move_generation(),
+            "evaluation": measure_evaluation(),
+            "search": measure_search(depths),
+            "games": measure_games(games)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite of the Othello engine")
+    parser.add_argument("--output", help="JSON file to write the results to (default: print them)")
+    parser.add_argument("--depths", type=int, nargs="+", default=list(DEFAULT_DEPTHS), help="search depths")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="number of agent vs agent games")
+    arguments = parser.parse_args()
+
+    results = run(arguments.depths, arguments.games)
+    if arguments.output:
+        with open(arguments.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
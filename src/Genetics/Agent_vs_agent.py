@@ -16,6 +16,7 @@ class AgentVsAgent:
         self.game_logic = othello_logic.OthelloLogic()
         self.DEPTH_IN_TREE = 0
         self.winner_gene = None
+        self.move_list = []  # (row, col) of every movement of the game in order
         self.start_game()
 
     def move_agent(self):
@@ -36,6 +37,7 @@ class AgentVsAgent:
 
         # make the movement for the agent whose turn is now
         self.game_logic.check_movements(player_ch, dest_row, dest_col, True)
+        self.move_list.append((dest_row, dest_col))
 
         # change the turn if the opponent has any moves
         if self.game_logic.player_has_any_moves(opponent_ch, True):
@@ -62,3 +64,6 @@ class AgentVsAgent:
 
     def get_winner(self):
         return self.winner_gene
+
+    def get_move_list(self):
+        return self.move_list
@@ -0,0 +1,281 @@
+"""
+    Distributed games for the genetic algorithm
+    a Coordinator (in the Evolution process) listens on a socket and hands out batches of games to workers on any
+    host; a worker asks for a batch, plays it and sends the results with its next request, and sends heartbeats while
+    it plays; the games of a worker that is lost (no message for HEARTBEAT_TIMEOUT seconds or a closed connection)
+    are given to other workers again
+    a task is sent as the full module path of its function and its pickled arguments, a worker imports the function,
+    so a task that can't be loaded (or raises) is sent back as failed instead of stopping the worker
+    Coordinator.map has the same use as ProcessPoolExecutor.map, so Evolution uses it in place of the process pool
+    start workers from the repository root: python -m src.Genetics.Distributed --address localhost:6000 --processes 4
+    the default key is only accepted on a loopback address, give the same --authkey to the coordinator and the workers
+"""
+
+import argparse
+import collections
+import importlib
+import ipaddress
+import multiprocessing
+import pickle
+import socket
+import sys
+import threading
+import time
+import traceback
+from multiprocessing.connection import Client, Listener
+
+# Constant values
+DEFAULT_ADDRESS = ("localhost", 6000)
+DEFAULT_AUTHKEY = b"othello"
+BATCH_SIZE = 4  # games sent to a worker at once at most, fewer when there aren't enough games for all the workers
+HEARTBEAT_INTERVAL = 2.0  # seconds between the heartbeats of a worker
+HEARTBEAT_TIMEOUT = 10.0  # a worker is lost if the coordinator gets no message from it in this many seconds
+IDLE_WAIT = 0.1  # seconds a worker waits before asking again when there are no games
+MAX_RETRIES = 3  # a game is given to another worker at most this many times
+BACKLOG = 128  # connections of workers that wait to be accepted (many workers start at the same time)
+NO_WORKERS_TIMEOUT = 60.0  # map fails if no worker is connected for this many seconds
+# messages (tuples, the first item is the type)
+REQUEST = "request"  # worker: (REQUEST, results of the previous batch: [(task id, succeeded, result)])
+HEARTBEAT = "heartbeat"  # worker: (HEARTBEAT,)
+TASKS = "tasks"  # coordinator: (TASKS, [(task id, function path, pickled arguments)])
+IDLE = "idle"  # coordinator: (IDLE,) there are no games now
+STOP = "stop"  # coordinator: (STOP,) the worker must exit
+
+
+def parse_address(text):
+    """ Converts 'host:port' to (host, port) """
+    (host, port) = text.rsplit(":", 1)
+    return host, int(port)
+
+
+def is_loopback(host):
+    """ Checks if the host name or address is a loopback address (only local processes can connect to it) """
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        pass
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+def function_path(function):
+    """ Returns 'module:name' of a module level function, the module of the script that was started with
+    python -m is given by its real name instead of __main__ (the workers import it by that name) """
+    module = function.__module__
+    if module == "__main__":
+        spec = getattr(sys.modules["__main__"], "__spec__", None)
+        if spec is None:
+            raise ValueError("functions of a script can't be sent to workers, start it with python -m")
+        module = spec.name
+    return module + ":" + function.__qualname__
+
+
+def load_function(path):
+    """ Imports the function of function_path """
+    (module, name) = path.split(":", 1)
+    return getattr(importlib.import_module(module), name)
+
+
+class Coordinator:
+    """ Hands out tasks (function and arguments, the function must be importable by the workers) to the workers
+    that connect to the address """
+
+    def __init__(self, address=DEFAULT_ADDRESS, authkey=DEFAULT_AUTHKEY, batch_size=BATCH_SIZE,
+                 heartbeat_timeout=HEARTBEAT_TIMEOUT, max_retries=MAX_RETRIES, no_workers_timeout=NO_WORKERS_TIMEOUT):
+        self.address = address
+        self.authkey = authkey
+        self.batch_size = batch_size
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_retries = max_retries
+        self.no_workers_timeout = no_workers_timeout
+        self.listener = None
+        self.condition = threading.Condition()  # guards everything below
+        self.tasks = {}  # task id -> (function path, pickled arguments) of the tasks that are not finished
+        self.pending = collections.deque()  # ids of the tasks that are not given to a worker
+        self.results = {}  # task id -> result
+        self.retries = collections.Counter()  # task id -> number of times the task was lost
+        self.error = None  # message of a failed task, raised by map
+        self.next_id = 0
+        self.workers = 0  # connected workers
+        self.no_workers_since = time.monotonic()  # time when the last worker was lost (or the coordinator started)
+        self.closed = False
+
+    def start(self):
+        """ Starts listening (in a background thread), the default key is refused on an address that isn't loopback
+        (anyone who can reach the port could send pickled data with it) """
+        if self.authkey == DEFAULT_AUTHKEY and not is_loopback(self.address[0]):
+            raise ValueError("a key other than the default one is needed to listen on " + str(self.address[0]))
+        self.no_workers_since = time.monotonic()
+        self.listener = Listener(self.address, backlog=BACKLOG, authkey=self.authkey)
+        self.address = self.listener.address  # the real port if port 0 was given
+        threading.Thread(target=self.accept_workers, daemon=True).start()
+
+    def accept_workers(self):
+        while not self.closed:
+            try:
+                connection = self.listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError):
+                continue
+            threading.Thread(target=self.serve_worker, args=(connection,), daemon=True).start()
+
+    def serve_worker(self, connection):
+        """ Answers the messages of one worker until it's lost or stopped """
+        in_flight = []  # ids of the tasks given to this worker
+        with self.condition:
+            self.workers += 1
+        try:
+            while True:
+                if not connection.poll(self.heartbeat_timeout):
+                    break  # the worker is lost
+                message = connection.recv()
+                if message[0] != REQUEST:  # a heartbeat
+                    continue
+                with self.condition:
+                    self.add_results(message[1])
+                    in_flight = []
+                    if self.closed:
+                        reply = (STOP,)
+                    else:
+                        batch_size = self.next_batch_size()
+                        while self.pending and len(in_flight) < batch_size:
+                            task_id = self.pending.popleft()
+                            if task_id in self.tasks:
+                                in_flight.append(task_id)
+                        reply = (TASKS, [(task_id,) + self.tasks[task_id] for task_id in in_flight]) if in_flight \
+                            else (IDLE,)
+                connection.send(reply)
+                if reply[0] == STOP:
+                    break
+        except (EOFError, OSError):
+            pass  # the connection is closed
+        finally:
+            connection.close()
+            with self.condition:
+                self.workers -= 1
+                if self.workers == 0:
+                    self.no_workers_since = time.monotonic()
+                self.requeue(in_flight)
+
+    def next_batch_size(self):
+        """ Size of the next batch: the waiting tasks are shared by all the workers, so no worker is idle while
+        another one has more than one waiting task (called with the condition held) """
+        return max(1, min(self.batch_size, -(-len(self.pending) // max(1, self.workers))))
+
+    def add_results(self, results):
+        """ Saves the results of a batch (called with the condition held) """
+        for task_id, succeeded, result in results:
+            if task_id not in self.tasks:
+                continue  # already finished by another worker
+            del self.tasks[task_id]
+            if succeeded:
+                self.results[task_id] = result
+            else:
+                self.error = result
+        self.condition.notify_all()
+
+    def requeue(self, task_ids):
+        """ Gives the unfinished tasks of a lost worker to other workers (called with the condition held) """
+        for task_id in task_ids:
+            if task_id in self.tasks:
+                self.retries[task_id] += 1
+                if self.retries[task_id] > self.max_retries:
+                    self.error = "task " + str(task_id) + " was lost " + str(self.retries[task_id]) + " times"
+                self.pending.appendleft(task_id)
+        self.condition.notify_all()
+
+    def map(self, function, *iterables):
+        """ Runs function on the workers for every item of the iterables (like the built-in map) and returns the
+        results in order, waits until all of them are finished
+        raises RuntimeError if a task fails or no worker is connected for no_workers_timeout seconds """
+        path = function_path(function)
+        with self.condition:
+            task_ids = []
+            for arguments in zip(*iterables):
+                self.tasks[self.next_id] = (path, pickle.dumps(arguments))
+                self.pending.append(self.next_id)
+                task_ids.append(self.next_id)
+                self.next_id += 1
+            while self.error is None and any(task_id not in self.results for task_id in task_ids):
+                if self.workers == 0 and time.monotonic() - self.no_workers_since > self.no_workers_timeout:
+                    self.error = "no worker is connected for " + str(self.no_workers_timeout) + " seconds"
+                    break
+                self.condition.wait(IDLE_WAIT)
+            if self.error is not None:
+                error = self.error
+                self.cancel(task_ids)
+                raise RuntimeError("distributed task failed: " + error)
+            return [self.results.pop(task_id) for task_id in task_ids]
+
+    def cancel(self, task_ids):
+        """ Forgets the tasks and results of a failed map (called with the condition held) """
+        for task_id in task_ids:
+            self.tasks.pop(task_id, None)
+            self.results.pop(task_id, None)
+        self.pending = collections.deque(task_id for task_id in self.pending if task_id in self.tasks)
+        self.error = None
+
+    def close(self):
+        """ Stops the workers (at their next request) and the listener """
+        with self.condition:
+            self.closed = True
+        if self.listener is not None:
+            self.listener.close()
+
+
+def run_worker(address=DEFAULT_ADDRESS, authkey=DEFAULT_AUTHKEY):
+    """ Connects to a coordinator and plays its tasks until it stops the worker or the connection is lost """
+    connection = Client(address, authkey=authkey)
+    send_lock = threading.Lock()  # the main thread and the heartbeat thread send messages
+    stopped = threading.Event()
+
+    def send_heartbeats():
+        while not stopped.wait(HEARTBEAT_INTERVAL):
+            with send_lock:
+                connection.send((HEARTBEAT,))
+
+    threading.Thread(target=send_heartbeats, daemon=True).start()
+    results = []
+    try:
+        while True:
+            with send_lock:
+                connection.send((REQUEST, results))
+            results = []
+            message = connection.recv()
+            if message[0] == STOP:
+                break
+            if message[0] == IDLE:
+                time.sleep(IDLE_WAIT)
+                continue
+            for task_id, path, arguments in message[1]:
+                try:
+                    results.append((task_id, True, load_function(path)(*pickle.loads(arguments))))
+                except Exception:  # the task can't be loaded or it failed
+                    results.append((task_id, False, traceback.format_exc()))
+    except (EOFError, OSError):
+        pass  # the coordinator is gone
+    finally:
+        stopped.set()
+        with send_lock:
+            connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker processes of distributed genetic training")
+    parser.add_argument("--address", type=parse_address, default=DEFAULT_ADDRESS, help="host:port of the coordinator")
+    parser.add_argument("--authkey", default=DEFAULT_AUTHKEY.decode(),
+                        help="shared key of the coordinator (the default one works only on a loopback address)")
+    parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count(), help="worker processes")
+    arguments = parser.parse_args()
+
+    processes = [multiprocessing.Process(target=run_worker, args=(arguments.address, arguments.authkey.encode()))
+                 for i in range(arguments.processes)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+    Structured event log of the genetic algorithm
+    every event (a gene, a match, a generation, ...) is one JSON line; events are put in a queue and a background
+    thread writes them to the file, which is flushed every FLUSH_INTERVAL seconds, so logging doesn't wait for the disk
+    and a crash loses only the last moment of the log
+    console messages are optional and rate limited (important messages are always printed)
+    if the writer thread fails (an event that can't be saved as JSON, a full disk, ...) its error is raised by the
+    next log, flush or close call
+"""
+
+import json
+import queue
+import threading
+import time
+
+# Constant values
+FLUSH_INTERVAL = 1.0  # seconds between the flushes of the log file
+CONSOLE_INTERVAL = 0.2  # minimum seconds between two console messages that are not important
+BUFFER_SIZE = 1 << 16  # bytes of the file buffer
+LIVENESS_INTERVAL = 0.5  # seconds between the checks that the writer thread is alive while flush waits
+_STOP = None  # put in the queue to stop the writer thread
+
+
+class EventLog:
+    """ Writes events to a JSON lines file (path None for no file) and prints their messages (console False for no
+    console output) """
+
+    def __init__(self, path=None, console=True, flush_interval=FLUSH_INTERVAL, console_interval=CONSOLE_INTERVAL):
+        self.path = path
+        self.console = console
+        self.flush_interval = flush_interval
+        self.console_interval = console_interval
+        self.last_print = None  # time.perf_counter() of the last console message
+        self.skipped = 0  # console messages dropped since the last printed one
+        self.events = queue.Queue()
+        self.error = None  # exception that stopped the writer thread
+        self.thread = None
+        if path is not None:
+            self.thread = threading.Thread(target=self.write_events, args=(open(path, "a", buffering=BUFFER_SIZE),),
+                                           daemon=True)
+            self.thread.start()
+
+    def log(self, event, message=None, important=False, **fields):
+        """ Logs an event: 'event' is its type, fields are saved with it and message is printed to the console """
+        if self.thread is not None:
+            self.raise_error()
+            record = {"time": round(time.time(), 3), "event": event}
+            record.update(fields)
+            self.events.put(record)
+        if message is not None and self.console:
+            self.print_message(message, important)
+
+    def print_message(self, message, important):
+        now = time.perf_counter()
+        if not important and self.last_print is not None and now - self.last_print < self.console_interval:
+            self.skipped += 1
+            return
+        if self.skipped:
+            print("... (" + str(self.skipped) + " messages skipped)")
+            self.skipped = 0
+        print(message, end="")
+        self.last_print = now
+
+    def write_events(self, f):
+        """ Loop of the writer thread: writes the queued events and flushes the file periodically """
+        next_flush = time.perf_counter() + self.flush_interval
+        try:
+            with f:
+                while True:
+                    try:
+                        record = self.events.get(timeout=max(0.0, next_flush - time.perf_counter()))
+                    except queue.Empty:
+                        record = None
+                    else:
+                        if record is _STOP:
+                            break
+                        if isinstance(record, threading.Event):  # a flush request (see flush)
+                            f.flush()
+                            record.set()
+                            continue
+                        f.write(json.dumps(record, separators=(",", ":"), default=json_value) + "\n")
+                    if time.perf_counter() >= next_flush:
+                        f.flush()
+                        next_flush = time.perf_counter() + self.flush_interval
+        except Exception as error:  # saved for the logging thread (see raise_error)
+            self.error = error
+
+    def raise_error(self):
+        """ Raises the error of the writer thread if it failed """
+        if self.error is not None:
+            raise RuntimeError("writing the event log failed: " + repr(self.error)) from self.error
+
+    def flush(self):
+        """ Waits until the events logged so far are written to the file and flushes it """
+        if self.thread is not None:
+            self.raise_error()
+            done = threading.Event()
+            self.events.put(done)
+            while not done.wait(LIVENESS_INTERVAL) and self.thread.is_alive():
+                pass
+            self.raise_error()
+
+    def close(self):
+        """ Writes the remaining events and closes the file """
+        if self.thread is not None:
+            self.events.put(_STOP)
+            self.thread.join()
+            self.thread = None
+            self.raise_error()
+
+
+def json_value(value):
+    """ Converts numpy scalars and arrays of the events to JSON values """
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError("an event field of type " + type(value).__name__ + " can't be saved as JSON")
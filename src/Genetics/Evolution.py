@@ -1,7 +1,15 @@
-import math
-from random import *
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy
 from src.Genetics.Agent_vs_agent import AgentVsAgent
+import src.Genetics.Distributed as Distributed
+import src.Genetics.Event_log as Event_log
 import src.Genetics.Gene as GeneFile
+import src.Genetics.Population as Population
+import src.Logic.Game_record as Game_record
+import src.Logic.Othello_logic as othello_logic
 
 # Constant values
 MIN_WEIGHT = 1
@@ -14,25 +22,65 @@ BEST_GENE_CROSOV_SIZE = 9
 WORST_GENE_CROSOV_SIZE = 1
 BEST_WORST_CROSOV_SIZE = 7
 LEAGUE_SIZE = 5
+NUM_OF_WORKERS = os.cpu_count() or 1  # processes that play the games, 1 plays them in this process
+LOG_FILE = "evolution_log.jsonl"
+CHECKPOINT_FILE = "evolution_checkpoint.json"
+CHECKPOINT_VERSION = 2  # version 2: numpy random generator
+# fitness evaluation: a full round robin in every league, or racing (successive halving of the genes that may be
+# among the best ones, genes keep their results from previous generations and settled genes don't play)
+ROUND_ROBIN = "round_robin"
+RACING = "racing"
+# games of every candidate in each racing round, the better half of the candidates is left for the next round
+# (25 genes: 13 + 13 + 7 games at most, the round robin of the leagues plays 50)
+HALVING_ROUNDS = (1, 2, 2)
+MIN_SETTLE_GAMES = 6  # a gene with less games than this is never settled
+MAX_RACING_GAMES = 12  # a gene doesn't play more games once it has this many
+RACING_Z = 1.64  # standard deviations of the confidence bounds (a one sided 95% bound)
+
+
+def play_match(weight_list1, weight_list2):
+    """ plays one agent vs agent game in a worker process
+        returns (winner, game): winner is 0 if the first gene wins, 1 if the second gene wins and None for a tie,
+        game is (movements, black disks, white disks) for Game_record """
+    gene1 = GeneFile.Gene(weight_list1)
+    game = AgentVsAgent(gene1, GeneFile.Gene(weight_list2))
+    logic = game.game_logic
+    record = (Game_record.encode_moves(game.get_move_list()), logic.score_calculate(othello_logic.BLACK),
+              logic.score_calculate(othello_logic.WHITE))
+    winner = game.get_winner()
+    if winner is None:
+        return None, record
+    return (0 if winner is gene1 else 1), record
 
 
 class Evolution:
 
-    def __init__(self):
+    def __init__(self, workers=NUM_OF_WORKERS, game_records=None, log_file=LOG_FILE, console=True,
+                 checkpoint_file=CHECKPOINT_FILE, evaluation=ROUND_ROBIN, seed=None, coordinator_address=None,
+                 authkey=Distributed.DEFAULT_AUTHKEY):
+        self.workers = workers  # size of the process pool
+        self.executor = None  # process pool (or coordinator), exists while run() is running
+        # (host, port) to listen on for distributed workers (see Distributed), None to play in the process pool
+        self.coordinator_address = coordinator_address
+        self.authkey = authkey  # key of the workers (bytes), the default one is refused on a non loopback address
+        self.game_records = game_records  # file that all the games are appended to (see Game_record), None for no file
+        self.record_writer = None  # Game_record.GameRecordWriter, exists while run() is running
         self.generation_number = 1
         self.generation_limit = 3  # TODO: may need to change
-        self.gene_list = []
+        self.population = None  # Population.Population of the genes (weights, games and wins as numpy arrays)
         self.mutation_probability = 0.2  # is divided by generation number when mutating
-        self.log_history = ""
+        self.log_file = log_file  # JSON lines file of the events (see Event_log), None for no file
+        self.console = console  # print (rate limited) messages of the events
+        self.event_log = None  # Event_log.EventLog, exists while run() is running
+        self.checkpoint_file = checkpoint_file  # the state is saved at the start of every generation, None for no file
+        self.evaluation = evaluation  # ROUND_ROBIN or RACING
+        self.rng = numpy.random.default_rng(seed)  # all the random numbers of the run, seed it for a reproducible run
 
     def init_generation(self):
         """ Generate initial generation (first population)
             first generation is randomly selected """
-
-        for i in range(TOTAL_POPULATION):
-            random_list = [randint(MIN_WEIGHT, MAX_WEIGHT) for i in range(NUM_OF_FEATURES - 1)]
-            random_list.append(randint(MIN_WEIGHT, MIN_WEIGHT + 10))  # last feature is not much important
-            self.gene_list.append(GeneFile.Gene(random_list))
+        self.population = Population.Population.random(TOTAL_POPULATION, NUM_OF_FEATURES, MIN_WEIGHT, MAX_WEIGHT,
+                                                       self.rng)
 
     def next_generation(self):
         """ Generate next generation
@@ -41,146 +89,203 @@ class Evolution:
             generation size is not changed
             """
 
-        self.sort_genes()  # sort list of gens by fitness value
+        self.sort_genes()  # sort the population by fitness value
+        population = self.population
 
-        # grouping current population into two groups of best and worst
-        best_list = self.gene_list[:BEST_GENE_SIZE]
-        worst_list = self.gene_list[BEST_GENE_SIZE: TOTAL_POPULATION]
+        # grouping current population into two groups of best and worst (indices of the sorted population)
+        best_list = numpy.arange(BEST_GENE_SIZE)
+        worst_list = numpy.arange(BEST_GENE_SIZE, TOTAL_POPULATION)
 
-        # set the next generation
-        new_generation = best_list
-        new_generation.extend(self.random_genes(WORST_GENE_SIZE, worst_list))
-        new_generation.extend(self.cross_over(best_list, BEST_GENE_CROSOV_SIZE, False))
-        new_generation.extend(self.cross_over(worst_list, WORST_GENE_CROSOV_SIZE, False))
-        new_generation.extend(self.cross_over(self.gene_list, BEST_WORST_CROSOV_SIZE, True))
+        # set the next generation, the genes that are moved keep their results
+        survivors = numpy.concatenate((best_list, self.rng.choice(worst_list, WORST_GENE_SIZE, replace=False)))
 
         # change the current population to next generation
-        self.gene_list = new_generation
-
-    def cross_over(self, parents_list, children_size, is_separated):
-        """ creates new genes using a weighted average of parents features
+        self.population = Population.Population.concatenate([
+            population.select(survivors),
+            self.cross_over(population, best_list, BEST_GENE_CROSOV_SIZE),
+            self.cross_over(population, worst_list, WORST_GENE_CROSOV_SIZE),
+            self.cross_over(population, best_list, BEST_WORST_CROSOV_SIZE, worst_list)])
+
+    def cross_over(self, population, parents_list, children_size, other_parents_list=None):
+        """ returns a population of new genes created using a weighted average of parents features
+            both parents are from parents_list, or one from parents_list and one from other_parents_list if it's given
             mutates the new genes with a probability decreasing in each next generation"""
 
-        children_list = []
-        for i in range(children_size):
-            parents = []
-            # check if the list of desired parents are separated
-            if is_separated:  # a parent from best and a parent from worse list
-                best_list = self.gene_list[:BEST_GENE_SIZE]
-                worst_list = self.gene_list[BEST_GENE_SIZE: TOTAL_POPULATION]
-                parents.extend(self.random_genes(1, best_list))
-                parents.extend(self.random_genes(1, worst_list))
-            else:  # both parents from given parent list
-                parents = self.random_genes(2, parents_list)  # choose parents for the new gene
-
-            new_weight_list = []  # feature values for the gene (weights)
-            alpha = random()  # parameter used for finding weighted average of parents features
-
-            # set each feature of the new gene to the weighted average of parents features
-            for j in range(NUM_OF_FEATURES):
-                new_weight_list.append(math.floor((alpha * parents[0].weight_list[j] +
-                                                   (1 - alpha) * parents[1].weight_list[j])))
-            # mutation with a probability
-            new_weight_list = self.mutate(new_weight_list)
-
-            # add the gene to children_list
-            child = GeneFile.Gene(new_weight_list)
-
-            # log parents and crossover result
-            # self.handle_logs(
-            #     self.list_to_str(parents[0].weight_list) + self.list_to_str(parents[1].weight_list)
-            #     + "{0:.2f}".format(alpha) + self.list_to_str(child.weight_list) + '\n')
-
-            children_list.append(child)
-
-        return children_list
-
-    def mutate(self, weight_list):
-        """ mutates the genes by subtracting or adding a random value to one of the features of the gene(the feature
-        is selected randomly) """
-
-        probability = self.mutation_probability / self.generation_number  # reduced in each generation for better
-        # exploitation
-
-        rand = random()
-        if rand < probability:
-
-            # randomly choose a feature and a bias for mutation
-            mutating_index = randrange(0, NUM_OF_FEATURES)
-            bias = randrange(-50, 50)
-
-            weight_list[mutating_index] += bias
-
-            # check if the feature exceeds the lower or upper bound of weight value
-            if weight_list[mutating_index] > MAX_WEIGHT:
-                weight_list[mutating_index] = MAX_WEIGHT
-            elif weight_list[mutating_index] < MIN_WEIGHT:
-                weight_list[mutating_index] = MIN_WEIGHT
-
-        return weight_list
-
-    def play_generation(self, league_start_indx, league_end_indx):
-        """ simulates game for each two different genes in the league
-            updates gene properties: total_games and total_wins
-            """
-
-        game_number = 0  # counts the number of games played in each generation
-
-        league_list = self.gene_list[league_start_indx:league_end_indx]
-
+        if other_parents_list is None:
+            (first, second) = Population.Population.random_pairs(len(parents_list), children_size, self.rng)
+            (parents1, parents2) = (parents_list[first], parents_list[second])
+        else:  # a parent from best and a parent from worse list
+            parents1 = self.rng.choice(parents_list, children_size)
+            parents2 = self.rng.choice(other_parents_list, children_size)
+        (children, alpha) = population.cross_over(parents1, parents2, self.rng)
+
+        # mutation with a probability, reduced in each generation for better exploitation
+        children.mutate(self.mutation_probability / self.generation_number, MIN_WEIGHT, MAX_WEIGHT, self.rng)
+
+        # log parents and crossover result (only in the event log)
+        for i, child in enumerate(children.weights.tolist()):
+            self.log_event("crossover", None, generation=self.generation_number,
+                           parents=[population.weights[parents1[i]].tolist(), population.weights[parents2[i]].tolist()],
+                           alpha=float(alpha[i]), child=child)
+        return children
+
+    def play_leagues(self):
+        """ simulates the games of all the leagues of the generation
+            all the games are sent to the process pool together, results are applied in the order of leagues """
+        matches = []
         for i in range(LEAGUE_SIZE):
-            gene1 = league_list[i]
-            for j in range(i + 1, LEAGUE_SIZE):
-                gene2 = league_list[j]
-
-                self.handle_logs("*************************" + '\n' +
-                                 "genes fight: " + str(game_number) + " " + self.list_to_str(gene1.weight_list)
-                                 + " vs " + self.list_to_str(gene2.weight_list) + '\n')
-
+            matches.extend(self.league_matches(i * LEAGUE_SIZE, (i + 1) * LEAGUE_SIZE))
+        self.play_matches(matches)
+
+    def play_racing(self):
+        """ successive halving: in every round of HALVING_ROUNDS each candidate (at first every gene) plays the
+            round's number of games, then only the better half of the candidates (by fitness, BEST_GENE_SIZE at least)
+            is left for the next round; a candidate whose rank is settled (see Population.settled) or that has
+            MAX_RACING_GAMES games doesn't play; genes that survived from the previous generation keep their results """
+        candidates = numpy.arange(len(self.population))
+        games = 0
+        for round_number, round_games in enumerate(HALVING_ROUNDS):
+            if round_number > 0:
+                order = numpy.argsort(-self.population.fitness()[candidates], kind="stable")
+                candidates = candidates[order[:max(BEST_GENE_SIZE, (len(candidates) + 1) // 2)]]
+            for i in range(round_games):
+                matches = self.racing_matches(self.racing_players(candidates), candidates)
+                self.play_matches(matches)
+                games += len(matches)
+        settled = int(self.population.settled(BEST_GENE_SIZE, RACING_Z, MIN_SETTLE_GAMES).sum())
+        self.log_event("racing", "racing games: " + str(games) + ", settled genes: " + str(settled) + '\n', True,
+                       generation=self.generation_number, games=games, settled=settled)
+
+    def racing_players(self, candidates):
+        """ indices of the candidates that are not settled and have less than MAX_RACING_GAMES games """
+        playing = (self.population.total_games < MAX_RACING_GAMES) & \
+            ~self.population.settled(BEST_GENE_SIZE, RACING_Z, MIN_SETTLE_GAMES)
+        return candidates[playing[candidates]]
+
+    def racing_matches(self, players, candidates):
+        """ returns the matches of one game of every player: the players are paired randomly, the last one of an odd
+            number of players plays against a random candidate with less than MAX_RACING_GAMES games (any other
+            candidate if there isn't such one, and any other gene if there is no other candidate) """
+        players = self.rng.permutation(players).tolist()  # shuffled
+        matches = []
+        while players:
+            index1 = players.pop()
+            if players:
+                index2 = players.pop()
+            else:
+                others = candidates[candidates != index1]
+                if not len(others):
+                    others = numpy.delete(numpy.arange(len(self.population)), index1)
+                opponents = others[self.population.total_games[others] < MAX_RACING_GAMES]
+                index2 = int(self.rng.choice(opponents if len(opponents) else others))
+            matches.append((len(matches), index1, index2))
+        return matches
+
+    def league_matches(self, league_start_indx, league_end_indx):
+        """ returns (game_number, index1, index2) for each two different genes in the league """
+        game_number = 0  # counts the number of games played in each league
+
+        matches = []
+        for index1 in range(league_start_indx, league_end_indx):
+            for index2 in range(index1 + 1, league_end_indx):
+                matches.append((game_number, index1, index2))
                 game_number += 1
-                gene1.increment_total_game()
-                gene2.increment_total_game()
-
-                # simulate ai_vs_ai game and find the winner
-                winner = self.play_ai_vs_ai(gene1, gene2)
-
-                if winner is None:  # game was tie
-                    gene1.increment_for_tie()
-                    gene2.increment_for_tie()
-                    self.handle_logs("tie" + '\n')
-                else:
-                    winner.increment_for_winning()
-                    self.handle_logs("winner is: " + self.list_to_str(winner.weight_list) + '\n')
-
-        # update genes in gene_list
-        self.gene_list[league_start_indx:league_end_indx] = league_list
-
-    @staticmethod
-    def play_ai_vs_ai(gene1: GeneFile.Gene, gene2: GeneFile.Gene):
-        """ game is simulated between the input genes and the winner gene is returned"""
-
-        winner_gene = AgentVsAgent(gene1, gene2).get_winner()
-        return winner_gene
-
-    def run(self):
+        return matches
+
+    def play_matches(self, matches):
+        """ plays the games (in the process pool or on the distributed workers if there are any) then updates the genes and logs the results
+            in the order of matches, so the results don't depend on which game finishes first """
+        if not matches:
+            return
+        (game_numbers, first, second) = (numpy.array(column) for column in zip(*matches))
+        weights = self.population.weights.tolist()
+        weight_lists1 = [weights[i] for i in first]
+        weight_lists2 = [weights[i] for i in second]
+        if self.executor is None:
+            results = map(play_match, weight_lists1, weight_lists2)
+        else:
+            results = self.executor.map(play_match, weight_lists1, weight_lists2)
+
+        winners = []
+        for game_number, weight_list1, weight_list2, (winner_index, game) in zip(game_numbers.tolist(), weight_lists1,
+                                                                              weight_lists2, results):
+            if self.record_writer is not None:
+                self.record_writer.write(*game)
+            message = ("*************************" + '\n' +
+                       "genes fight: " + str(game_number) + " " + self.list_to_str(weight_list1)
+                       + " vs " + self.list_to_str(weight_list2) + '\n')
+            if winner_index is None:  # game was tie
+                message += "tie" + '\n'
+            else:
+                message += "winner is: " + self.list_to_str(weight_list1 if winner_index == 0 else weight_list2) + '\n'
+            self.log_event("match", message, generation=self.generation_number, game_number=game_number,
+                           gene1=weight_list1, gene2=weight_list2, winner=winner_index)
+            winners.append(-1 if winner_index is None else winner_index)
+        self.population.add_results(first, second, winners)
+
+    def run(self, resume=False):
         """ runs the game for all desired generations
             and prints the best gene in the final generation(the gene we are looking for)
             logs each generation genes to a file
+            if resume is true the run continues from the generation saved in the checkpoint file
             """
-        # select the initial population
-        self.init_generation()
+        if resume:
+            self.truncate_outputs()
+        if self.game_records is not None:
+            self.record_writer = Game_record.GameRecordWriter(self.game_records, {"source": "evolution"})
+        self.event_log = Event_log.EventLog(self.log_file, self.console)
+        try:
+            if self.coordinator_address is not None:
+                coordinator = Distributed.Coordinator(self.coordinator_address, self.authkey)
+                coordinator.start()
+                self.executor = coordinator
+                try:
+                    self.evolve(resume)
+                finally:
+                    self.executor = None
+                    coordinator.close()
+            elif self.workers > 1:
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    self.executor = executor
+                    try:
+                        self.evolve(resume)
+                    finally:
+                        self.executor = None
+            else:
+                self.evolve(resume)
+        finally:
+            if self.record_writer is not None:
+                self.record_writer.close()
+                self.record_writer = None
+            self.event_log.close()
+            self.event_log = None
+
+    def evolve(self, resume=False):
+        """ the generations loop of run() """
+        if resume:
+            self.load_checkpoint()
+            self.log_event("resume", "resumed from generation " + str(self.generation_number) + '\n', True,
+                           generation=self.generation_number)
+        else:
+            # select the initial population
+            self.init_generation()
 
         while self.generation_number <= self.generation_limit:
-            self.handle_logs("*********************************************" + '\n' +
-                             "generation number " + str(self.generation_number) + '\n')
-            for gene in self.gene_list:
-                self.handle_logs(self.list_to_str(gene.weight_list) + '\n')
-
-            # run the game for all pairs of genes in each league
-            for i in range(LEAGUE_SIZE):
-                self.play_generation(i*LEAGUE_SIZE, (i+1)*LEAGUE_SIZE)
-
-            self.log_generation_to_file()
+            self.save_checkpoint()
+            self.log_event("generation", "*********************************************" + '\n' +
+                           "generation number " + str(self.generation_number) + '\n', True,
+                           generation=self.generation_number)
+            for index, weight_list in enumerate(self.population.weights.tolist()):
+                self.log_event("gene", self.list_to_str(weight_list) + '\n', generation=self.generation_number,
+                               index=index, weight_list=weight_list)
+
+            if self.evaluation == RACING:
+                self.play_racing()
+            else:
+                # run the game for all pairs of genes in each league
+                self.play_leagues()
+
+            self.log_generation_results()
 
             if self.generation_number == self.generation_limit:
                 break
@@ -189,33 +294,90 @@ class Evolution:
 
         # print the best gene in the final generation
         self.sort_genes()
-        self.handle_logs(".................................\n" + "OPTIMUM WEIGHT LIST \n" +
-                         self.list_to_str(self.gene_list[0].weight_list) + '\n')
+        optimum = self.population.weights[0].tolist()
+        self.log_event("optimum", ".................................\n" + "OPTIMUM WEIGHT LIST \n" +
+                       self.list_to_str(optimum) + '\n', True, generation=self.generation_number, weight_list=optimum)
+
+    def save_checkpoint(self):
+        """ saves the state of the run (genes with their counters, generation and random generator state)
+            the file is replaced atomically, so a crash while saving keeps the previous checkpoint """
+        if self.checkpoint_file is None:
+            return
+        state = {"version": CHECKPOINT_VERSION,
+                 "generation_number": self.generation_number,
+                 "generation_limit": self.generation_limit,
+                 "mutation_probability": self.mutation_probability,
+                 "evaluation": self.evaluation,
+                 "random_state": self.rng.bit_generator.state,
+                 "outputs": self.output_offsets(),
+                 "genes": self.genes_state(include_fitness=True)}
+        temp_file = self.checkpoint_file + ".tmp"
+        with open(temp_file, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.checkpoint_file)
+
+    def output_offsets(self):
+        """ returns [path, size] of the event log and game record files (written out first), a resumed run truncates
+            them to these sizes, so the events and games of the interrupted generation are not in them twice """
+        offsets = {}
+        if self.event_log is not None and self.log_file is not None:
+            self.event_log.flush()
+            offsets["log"] = [self.log_file, os.path.getsize(self.log_file)]
+        if self.record_writer is not None:
+            self.record_writer.flush()
+            offsets["game_records"] = [self.game_records, os.path.getsize(self.game_records)]
+        return offsets
+
+    def truncate_outputs(self):
+        """ truncates the event log and game record files of this run to their sizes saved in the checkpoint """
+        with open(self.checkpoint_file) as f:
+            offsets = json.load(f).get("outputs", {})
+        for path, size in offsets.values():
+            if path in (self.log_file, self.game_records) and os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+
+    def load_checkpoint(self):
+        """ restores the state saved by save_checkpoint """
+        with open(self.checkpoint_file) as f:
+            state = json.load(f)
+        if state["version"] != CHECKPOINT_VERSION:
+            raise ValueError("unknown checkpoint version: " + str(state["version"]))
+        self.generation_number = state["generation_number"]
+        self.generation_limit = state["generation_limit"]
+        self.mutation_probability = state["mutation_probability"]
+        self.evaluation = state.get("evaluation", ROUND_ROBIN)  # checkpoints saved before racing existed
+        self.rng.bit_generator.state = state["random_state"]
+        genes = state["genes"]
+        self.population = Population.Population([gene["weight_list"] for gene in genes],
+                                                [gene["total_games"] for gene in genes],
+                                                [gene["total_wins"] for gene in genes])
+
+    def genes_state(self, include_fitness=False):
+        """ weight list and counters (and fitness) of every gene as a list of dictionaries (for JSON) """
+        population = self.population
+        genes = [{"weight_list": weight_list, "total_games": games, "total_wins": wins} for weight_list, games, wins
+                 in zip(population.weights.tolist(), population.total_games.tolist(), population.total_wins.tolist())]
+        if include_fitness:
+            for gene, fitness in zip(genes, population.fitness().tolist()):
+                gene["fitness"] = fitness
+        return genes
 
     def sort_genes(self):
-        """ sorts self.gene_list using genes fitness values"""
-        for gene in self.gene_list:
-            gene.fitness_calc()
-        self.gene_list = sorted(self.gene_list, key=self.cmp_fitness, reverse=True)
+        """ sorts the population using genes fitness values (genes with equal fitness keep their order) """
+        self.population = self.population.select(self.population.sorted_order())
 
-    def log_generation_to_file(self):
-        f = open("log" + str(self.generation_number) + ".txt", "w")
-        f.write(self.log_history)
-        f.close()
-        self.log_history = " "
+    def log_generation_results(self):
+        """ logs the counters of every gene at the end of a generation """
+        self.log_event("generation_end", None, generation=self.generation_number, genes=self.genes_state())
 
-    def handle_logs(self, message):
-        self.log_history += message
-        print(message, end="")
-
-    @staticmethod
-    def random_genes(size, gene_list):
-        """ randomly selects a number of 'size' genes from the given gene_list"""
-        return sample(gene_list, size)
-
-    @staticmethod
-    def cmp_fitness(gene):
-        return gene.fitness
+    def log_event(self, event, message, important=False, **fields):
+        """ logs an event to the event log (see Event_log.EventLog.log) or prints the message if there is no log """
+        if self.event_log is not None:
+            self.event_log.log(event, message, important, **fields)
+        elif message is not None and self.console:
+            print(message, end="")
 
     @staticmethod
     def list_to_str(list_):
@@ -223,5 +385,24 @@ class Evolution:
         return "[" + " ".join(str(x) for x in list_) + "]"
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Learns the weights of the heuristic with a genetic algorithm")
+    parser.add_argument("--resume", action="store_true", help="continue the run saved in the checkpoint file")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="checkpoint file")
+    parser.add_argument("--workers", type=int, default=NUM_OF_WORKERS, help="worker processes")
+    parser.add_argument("--log", default=LOG_FILE, help="event log file")
+    parser.add_argument("--game-records", help="binary file that the games are appended to (see Game_record)")
+    parser.add_argument("--evaluation", choices=(ROUND_ROBIN, RACING), default=ROUND_ROBIN, help="fitness evaluation")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the random generator")
+    parser.add_argument("--coordinator", type=Distributed.parse_address, default=None,
+                        help="host:port to listen on for distributed workers instead of using local processes")
+    parser.add_argument("--authkey", default=Distributed.DEFAULT_AUTHKEY.decode(),
+                        help="shared key of the distributed workers (needed on an address that isn't loopback)")
+    arguments = parser.parse_args()
+    Evolution(arguments.workers, arguments.game_records, arguments.log, checkpoint_file=arguments.checkpoint,
+              evaluation=arguments.evaluation, seed=arguments.seed,
+              coordinator_address=arguments.coordinator, authkey=arguments.authkey.encode()).run(arguments.resume)
+
+
 if __name__ == '__main__':
-    Evolution().run()
+    main()
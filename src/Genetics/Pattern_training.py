@@ -0,0 +1,85 @@
+"""
+    Training data of the pattern evaluation (see Agent/Pattern_evaluation)
+    games come from binary game records and from self-play between two agents with the optimum weights, every
+    position of a game is used in its 8 symmetric images and from the view of both colors, the target of a position
+    is the final disk difference
+    run from the repository root:
+    python -m src.Genetics.Pattern_training --games 500 --output patterns.npz
+"""
+
+import argparse
+import numpy
+import src.Logic.Othello_logic as Othello_logic  # first, it imports Minimax (importing Minimax first is circular)
+import src.Agent.Pattern_evaluation as Pattern_evaluation
+import src.Genetics.Self_play as Self_play
+import src.Logic.Bitboard as Bitboard
+import src.Logic.Game_record as Game_record
+import src.Logic.Symmetry as Symmetry
+
+# Constant values
+DEFAULT_GAMES = 1000
+DEFAULT_SEED = 1400
+RANDOM_MOVES = 6  # random movements of each agent at the start of the self-play games used for training
+
+
+def game_positions(move_list):
+    """ Replays a game given as a list of (row, col) and returns (black, white) after every movement and the final
+    disk difference of black """
+    logic = Othello_logic.OthelloLogic()
+    positions = []
+    for row, col in move_list:
+        if not logic.apply_move(row, col)[2]:
+            raise Othello_logic.MovementError()
+        positions.append((logic.disks[Othello_logic.BLACK], logic.disks[Othello_logic.WHITE]))
+    return positions, logic.score_calculate(Othello_logic.BLACK) - logic.score_calculate(Othello_logic.WHITE)
+
+
+def training_data(games):
+    """ Returns (agent disks, player disks, targets) of every position of the games (lists of movements) in its 8
+    symmetric images and from the view of both colors, the target is the final disk difference of the agent """
+    (agent_list, player_list, targets) = ([], [], [])
+    for move_list in games:
+        (positions, difference) = game_positions(move_list)
+        for black, white in positions:
+            for symmetry in range(Symmetry.NUM_OF_SYMMETRIES):
+                (black_image, white_image) = (Bitboard.transform(black, symmetry), Bitboard.transform(white, symmetry))
+                agent_list += [black_image, white_image]
+                player_list += [white_image, black_image]
+                targets += [difference, -difference]
+    return numpy.array(agent_list, dtype='<u8'), numpy.array(player_list, dtype='<u8'), numpy.array(targets, float)
+
+
+def self_play_games(games, seed=DEFAULT_SEED, workers=1):
+    """ Plays games between two agents with the optimum weights (their first movements are random) """
+    config = Self_play.AgentConfig(Othello_logic.OPTIMUM_WEIGHTS, search_depth=1, random_moves=RANDOM_MOVES)
+    return [Self_play.parse_moves(record["moves"])
+            for record in Self_play.SelfPlay(config, config, games, workers, seed).results()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trains the weight tables of the pattern evaluation")
+    parser.add_argument("--output", required=True, help="weights file (.npz)")
+    parser.add_argument("--game-records", nargs="*", default=[], help="binary game record files (see Game_record)")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="number of self-play games")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed of the self-play games")
+    parser.add_argument("--workers", type=int, default=1, help="processes that play the self-play games")
+    parser.add_argument("--epochs", type=int, default=Pattern_evaluation.EPOCHS, help="training epochs")
+    parser.add_argument("--weights", help="weights file to continue training from")
+    arguments = parser.parse_args()
+
+    games = [Game_record.decode_moves(moves) for path in arguments.game_records
+             for moves, black_disks, white_disks, tag in Game_record.GameRecordReader(path)]
+    games += self_play_games(arguments.games, arguments.seed, arguments.workers)
+    (agent_disks, player_disks, targets) = training_data(games)
+    if arguments.weights:
+        evaluator = Pattern_evaluation.PatternEvaluator.load(arguments.weights)
+    else:
+        evaluator = Pattern_evaluation.PatternEvaluator()
+    errors = evaluator.train(agent_disks, player_disks, targets, arguments.epochs)
+    evaluator.save(arguments.output)
+    print("games:", len(games), "positions:", len(targets), "rms error:", round(errors[0], 3), "->",
+          round(errors[-1], 3))
+
+
+if __name__ == '__main__':
+    main()
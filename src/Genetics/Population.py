@@ -0,0 +1,107 @@
+"""
+    Population of the genetic algorithm as numpy arrays
+    one row of the weight matrix for every gene, with the game counters of the genes in arrays of the same order;
+    Evolution keeps its genes in a Population; the operators (random initialization, sorting, crossover, mutation,
+    selection, game results and confidence bounds) work on all the genes at once and take their random numbers from
+    a numpy Generator, so a seeded run is reproducible
+"""
+
+import numpy
+
+# Constant values
+MUTATION_BIAS = 50  # a mutation adds a random value in [-MUTATION_BIAS, MUTATION_BIAS) to one weight
+LAST_WEIGHT_RANGE = 10  # the last feature is not much important, its initial weight is at most MIN + this
+
+
+class Population:
+    """ weights: (N, F) integer matrix, total_games, total_wins: (N,) integer arrays """
+
+    def __init__(self, weights, total_games=None, total_wins=None):
+        self.weights = numpy.asarray(weights, dtype=numpy.int64)
+        size = len(self.weights)
+        self.total_games = numpy.asarray(numpy.zeros(size) if total_games is None else total_games, numpy.int64)
+        self.total_wins = numpy.asarray(numpy.zeros(size) if total_wins is None else total_wins, numpy.int64)
+
+    @classmethod
+    def random(cls, size, num_of_features, min_weight, max_weight, rng):
+        """ Random population (the first generation) """
+        weights = rng.integers(min_weight, max_weight, size=(size, num_of_features), endpoint=True)
+        weights[:, -1] = rng.integers(min_weight, min_weight + LAST_WEIGHT_RANGE, size=size, endpoint=True)
+        return cls(weights)
+
+    def __len__(self):
+        return len(self.weights)
+
+    def fitness(self):
+        """ total_wins / total_games of every gene (zero for genes without games) """
+        return numpy.divide(self.total_wins, self.total_games, out=numpy.zeros(len(self), numpy.float64),
+                            where=self.total_games > 0)
+
+    def add_results(self, first, second, winners):
+        """ Counts the games between the genes of the index arrays first and second: winners is 0 if the first gene
+        won, 1 if the second gene won and -1 for a tie (a win is 2 points and a tie is 1 point for each gene) """
+        winners = numpy.asarray(winners)
+        numpy.add.at(self.total_games, first, 1)
+        numpy.add.at(self.total_games, second, 1)
+        numpy.add.at(self.total_wins, first, numpy.where(winners == 0, 2, winners == -1))
+        numpy.add.at(self.total_wins, second, numpy.where(winners == 1, 2, winners == -1))
+
+    def confidence_bounds(self, z):
+        """ Wilson score intervals (lower, upper arrays) of the score per game (total_wins / (2 * total_games),
+        between 0 and 1), z is the number of standard deviations; genes without games get (0, 1) """
+        n = numpy.maximum(self.total_games, 1)
+        p = self.total_wins / (2 * n)
+        denominator = 1 + z * z / n
+        center = (p + z * z / (2 * n)) / denominator
+        half_width = z * numpy.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+        played = self.total_games > 0
+        return numpy.where(played, center - half_width, 0.0), numpy.where(played, center + half_width, 1.0)
+
+    def settled(self, best_size, z, min_games=0):
+        """ Boolean array: it's known with confidence whether the gene is one of the best_size best genes, it's in
+        if less than best_size other genes may be better than it, and it's out if at least best_size other genes are
+        surely better than it; a gene with less than min_games games is not settled """
+        (lower, upper) = self.confidence_bounds(z)
+        others = ~numpy.eye(len(self), dtype=bool)
+        may_be_better = ((upper[None, :] > lower[:, None]) & others).sum(axis=1)
+        surely_better = ((lower[None, :] > upper[:, None]) & others).sum(axis=1)
+        return ((may_be_better < best_size) | (surely_better >= best_size)) & (self.total_games >= min_games)
+
+    def sorted_order(self):
+        """ Indices of the genes by descending fitness (genes with equal fitness keep their order) """
+        return numpy.argsort(-self.fitness(), kind="stable")
+
+    def select(self, indices):
+        """ Returns a population of the given rows (with their counters) """
+        return Population(self.weights[indices], self.total_games[indices], self.total_wins[indices])
+
+    @staticmethod
+    def concatenate(populations):
+        return Population(numpy.concatenate([population.weights for population in populations]),
+                          numpy.concatenate([population.total_games for population in populations]),
+                          numpy.concatenate([population.total_wins for population in populations]))
+
+    @staticmethod
+    def random_pairs(size, count, rng):
+        """ Returns two index arrays of 'count' pairs of different random indices below size """
+        first = rng.integers(0, size, count)
+        second = rng.integers(0, size - 1, count)
+        second += second >= first  # skips the first index, so the two parents are different
+        return first, second
+
+    def cross_over(self, parents1, parents2, rng):
+        """ Returns (children population, alpha of every child), the children weights are the weighted averages
+        alpha * weights of parents1 + (1 - alpha) * weights of parents2 (rounded down) """
+        alpha = rng.random(len(parents1))
+        children = numpy.floor(alpha[:, None] * self.weights[parents1] +
+                               (1 - alpha[:, None]) * self.weights[parents2]).astype(numpy.int64)
+        return Population(children), alpha
+
+    def mutate(self, probability, min_weight, max_weight, rng):
+        """ Every gene is mutated with the given probability: a random value is added to one of its weights
+        (the weight is clamped to [min_weight, max_weight]) """
+        size = len(self)
+        mutated = numpy.flatnonzero(rng.random(size) < probability)
+        features = rng.integers(0, self.weights.shape[1], len(mutated))
+        biases = rng.integers(-MUTATION_BIAS, MUTATION_BIAS, len(mutated))
+        self.weights[mutated, features] = numpy.clip(self.weights[mutated, features] + biases, min_weight, max_weight)
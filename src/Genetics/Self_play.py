@@ -0,0 +1,220 @@
+"""
+    Headless self-play between two agent configurations
+    plays many games in worker processes (the agents take turns to play black) and appends one JSON line per game
+    to the output file: colors, winner, disk counts, movements and the time of every movement
+    run from the repository root:
+    python -m src.Genetics.Self_play --games 100 --weights1 51 151 74 97 103 78 151 126 26 --output games.jsonl
+"""
+
+import argparse
+import collections
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+import src.Logic.Othello_logic as Othello_logic  # first, it imports Minimax (importing Minimax first is circular)
+import src.Agent.Minimax as Minimax
+import src.Agent.Opening_book as Opening_book
+import src.Agent.Pattern_evaluation as Pattern_evaluation
+import src.Agent.Tree as Tree
+import src.Logic.Game_record as Game_record
+
+# Constant values
+NUM_OF_WORKERS = os.cpu_count() or 1  # processes that play the games, 1 plays them in this process
+PENDING_GAMES = 4  # games submitted to the process pool at once per worker, so the memory doesn't grow with games
+FLUSH_GAMES = 100  # the output files are flushed after this many games
+DEFAULT_SEED = 1400
+
+
+class AgentConfig:
+    """ Settings of one agent: weight list, search depth or time budget (seconds per move) and randomization
+    random_moves: the first movements of the agent are random, so the games are different
+    noise: probability of a random movement after those
+    pattern_file: weights file of the pattern evaluation (see Pattern_evaluation), None to use the weight list """
+
+    def __init__(self, weight_list, search_depth=Minimax.MAX_DEPTH, time_budget=None, random_moves=0, noise=0.0,
+                 pattern_file=None):
+        self.weight_list = list(weight_list)
+        self.search_depth = search_depth
+        self.time_budget = time_budget
+        self.random_moves = random_moves
+        self.noise = noise
+        self.pattern_file = pattern_file
+
+    def create_minimax(self, othello_logic):
+        pattern_evaluator = Pattern_evaluation.load_evaluator(self.pattern_file) if self.pattern_file else None
+        return Minimax.Minimax(othello_logic, self.weight_list, time_budget=self.time_budget,
+                               search_depth=self.search_depth, pattern_evaluator=pattern_evaluator)
+
+    def to_dict(self):
+        return {"weight_list": self.weight_list, "search_depth": self.search_depth, "time_budget": self.time_budget,
+                "random_moves": self.random_moves, "noise": self.noise, "pattern_file": self.pattern_file}
+
+
+def parse_moves(text):
+    """ Converts the movements of a result record (standard notation, e.g. f5d6c3) to a list of (row, col) """
+    return [Opening_book.notation_to_cell(text[i:i + 2]) for i in range(0, len(text), 2)]
+
+
+def play_game(config1, config2, game_number, seed=DEFAULT_SEED):
+    """ Plays one game, config1 is black in even games and white in odd games
+    returns the result record of the game (agents are 0 for config1 and 1 for config2) """
+    rand = Random("{0}-{1}".format(seed, game_number))  # every game has its own random numbers
+    black_agent = game_number % 2
+    configs = (config1, config2)
+    logic = Othello_logic.OthelloLogic()
+    agents = [config.create_minimax(logic) for config in configs]
+    moves = []
+    move_ms = []
+    agent_ms = [0.0, 0.0]
+    agent_moves = [0, 0]
+
+    while not logic.end_of_game():
+        player_ch = Othello_logic.BLACK if logic.turn == Othello_logic.Player.BLACK.value else Othello_logic.WHITE
+        agent = black_agent if player_ch == Othello_logic.BLACK else 1 - black_agent
+        config = configs[agent]
+        start = time.perf_counter()
+        if agent_moves[agent] < config.random_moves or (config.noise and rand.random() < config.noise):
+            (row, col) = rand.choice(logic.get_possible_moves(player_ch))
+        else:
+            # the node depth is the number of movements made (see AgentVsAgent)
+            (row, col) = agents[agent].minimax_with_alpha_beta(Tree.Node(logic, len(moves)), player_ch)
+        ms = 1000 * (time.perf_counter() - start)
+        move_ms.append(round(ms, 3))
+        agent_ms[agent] += ms
+        agent_moves[agent] += 1
+        logic.apply_move(row, col)
+        moves.append((row, col))
+
+    winner_color = logic.find_winner()
+    if winner_color == Othello_logic.EMPTY:
+        winner = None
+    else:
+        winner = black_agent if winner_color == Othello_logic.BLACK else 1 - black_agent
+    return {"game": game_number,
+            "black": black_agent,
+            "winner": winner,
+            "black_disks": logic.score_calculate(Othello_logic.BLACK),
+            "white_disks": logic.score_calculate(Othello_logic.WHITE),
+            "moves": "".join(Opening_book.cell_to_notation(row, col) for row, col in moves),
+            "move_ms": move_ms,
+            "agent_ms": agent_ms,
+            "agent_moves": agent_moves}
+
+
+class SelfPlay:
+    """ Plays 'games' games between two agent configurations and keeps a summary of the results """
+
+    def __init__(self, config1, config2, games, workers=NUM_OF_WORKERS, seed=DEFAULT_SEED):
+        self.configs = (config1, config2)
+        self.games = games
+        self.workers = workers
+        self.seed = seed
+        self.wins = [0, 0]
+        self.draws = 0
+        self.disk_difference = 0  # sum of disks of config1 minus disks of config2
+        self.move_time = [0.0, 0.0]  # milliseconds of searching of each agent
+        self.move_count = [0, 0]
+        self.elapsed = 0.0
+
+    def results(self):
+        """ Yields the result records of the games in the order of game numbers as they are played
+        at most PENDING_GAMES games per worker are submitted and not yet yielded at any time """
+        if self.workers <= 1:
+            for game_number in range(self.games):
+                yield play_game(self.configs[0], self.configs[1], game_number, self.seed)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = collections.deque()
+            for game_number in range(self.games):
+                pending.append(executor.submit(play_game, self.configs[0], self.configs[1], game_number, self.seed))
+                if len(pending) >= PENDING_GAMES * self.workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def run(self, output=None, game_records=None):
+        """ Plays all the games, appends the records to the output file (if given) and the games to the game record
+        file (if given, tagged with the agent that played black) and returns the summary
+        the files are flushed every FLUSH_GAMES games, so a stopped run keeps (almost) all of its finished games """
+        start = time.perf_counter()
+        f = open(output, "a") if output else None
+        writer = None
+        if game_records:
+            writer = Game_record.GameRecordWriter(game_records, {"configs": [config.to_dict() for config in
+                                                                             self.configs], "seed": self.seed})
+        try:
+            for count, record in enumerate(self.results(), 1):
+                self.add_result(record)
+                if f is not None:
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+                if writer is not None:
+                    writer.write(parse_moves(record["moves"]), record["black_disks"], record["white_disks"],
+                                 record["black"])
+                if count % FLUSH_GAMES == 0:
+                    if f is not None:
+                        f.flush()
+                    if writer is not None:
+                        writer.flush()
+        finally:
+            if f is not None:
+                f.close()
+            if writer is not None:
+                writer.close()
+        self.elapsed = time.perf_counter() - start
+        return self.summary()
+
+    def add_result(self, record):
+        if record["winner"] is None:
+            self.draws += 1
+        else:
+            self.wins[record["winner"]] += 1
+        disks = (record["black_disks"], record["white_disks"])  # disks of the colors
+        black = record["black"]
+        self.disk_difference += disks[black] - disks[1 - black]
+        for agent in range(2):
+            self.move_time[agent] += record["agent_ms"][agent]
+            self.move_count[agent] += record["agent_moves"][agent]
+
+    def summary(self):
+        played = sum(self.wins) + self.draws
+        return {"configs": [config.to_dict() for config in self.configs],
+                "games": played,
+                "wins": self.wins,
+                "draws": self.draws,
+                "score1": (2 * self.wins[0] + self.draws) / (2 * played) if played else 0.0,
+                "average_disk_difference": self.disk_difference / played if played else 0.0,
+                "ms_per_move": [self.move_time[i] / self.move_count[i] if self.move_count[i] else 0.0
+                                for i in range(2)],
+                "seconds": self.elapsed,
+                "games_per_sec": played / self.elapsed if self.elapsed else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless self-play between two agents")
+    parser.add_argument("--games", type=int, default=10, help="number of games")
+    parser.add_argument("--output", help="file that the game records are appended to")
+    parser.add_argument("--game-records", help="binary file that the games are appended to (see Game_record)")
+    parser.add_argument("--workers", type=int, default=NUM_OF_WORKERS, help="worker processes")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed of the random movements")
+    for agent in ("1", "2"):
+        parser.add_argument("--weights" + agent, type=int, nargs="+", default=list(Othello_logic.OPTIMUM_WEIGHTS),
+                            help="weight list of agent " + agent)
+        parser.add_argument("--depth" + agent, type=int, default=Minimax.MAX_DEPTH, help="search depth")
+        parser.add_argument("--time" + agent, type=float, default=None, help="seconds per move (iterative deepening)")
+        parser.add_argument("--random-moves" + agent, type=int, default=2, help="random first movements")
+        parser.add_argument("--noise" + agent, type=float, default=0.0, help="probability of a random movement")
+        parser.add_argument("--patterns" + agent, default=None, help="pattern weights file (see Pattern_evaluation)")
+    arguments = vars(parser.parse_args())
+
+    configs = [AgentConfig(arguments["weights" + agent], arguments["depth" + agent], arguments["time" + agent],
+                           arguments["random_moves" + agent], arguments["noise" + agent], arguments["patterns" + agent])
+               for agent in ("1", "2")]
+    summary = SelfPlay(configs[0], configs[1], arguments["games"], arguments["workers"], arguments["seed"]).run(
+        arguments["output"], arguments["game_records"])
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
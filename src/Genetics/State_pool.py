@@ -0,0 +1,120 @@
+"""
+    Pool of game states in shared memory
+    a fixed-size record (disks of both colors, color to move, ply, status, best move and score) for every slot of a
+    numpy array that lives in multiprocessing.shared_memory, so worker processes attach to the pool by its name and
+    read states and write results in place, only (pool name, slot indices) is sent to them
+    the positions of many games can also be scored by the heuristic in one batch (StatePool.evaluate)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy
+import src.Logic.Othello_logic as Othello_logic  # first, it imports Minimax (importing Minimax first is circular)
+import src.Agent.Heuristic as Heuristic
+import src.Agent.Minimax as Minimax
+import src.Agent.Tree as Tree
+
+# Constant values
+STATE_DTYPE = numpy.dtype([("black", "<u8"), ("white", "<u8"), ("score", "<f8"), ("color", "u1"), ("ply", "u1"),
+                           ("status", "u1"), ("move", "u1")], align=True)  # 32 bytes
+FREE, READY, DONE = (0, 1, 2)  # status of a slot: unused, a state to search, a result is written
+NO_MOVE = 255
+NUM_OF_WORKERS = os.cpu_count() or 1
+COLORS = (Othello_logic.BLACK, Othello_logic.WHITE)
+TURNS = (Othello_logic.Player.BLACK.value, Othello_logic.Player.WHITE.value)
+
+
+class StatePool:
+    """ Creates a pool of 'size' slots (name None) or attaches to the existing pool with the given name
+    the process that created the pool must unlink it when it's not needed anymore """
+
+    def __init__(self, size, name=None):
+        self.size = size
+        self.created = name is None
+        self.memory = shared_memory.SharedMemory(name=name, create=self.created, size=size * STATE_DTYPE.itemsize)
+        self.records = numpy.ndarray((size,), STATE_DTYPE, buffer=self.memory.buf)
+        if self.created:
+            self.records[:] = 0
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def put_state(self, index, black, white, color, ply):
+        """ Writes a state to search, color is the player to move (Othello_logic.BLACK or WHITE) """
+        record = self.records[index]
+        record["black"] = black
+        record["white"] = white
+        record["color"] = COLORS.index(color)
+        record["ply"] = ply
+        record["move"] = NO_MOVE
+        record["score"] = 0.0
+        record["status"] = READY
+
+    def get_state(self, index):
+        """ Returns (black, white, color, ply) """
+        record = self.records[index]
+        return int(record["black"]), int(record["white"]), COLORS[record["color"]], int(record["ply"])
+
+    def put_result(self, index, move):
+        """ Writes the best move (row, col) or None of a state """
+        record = self.records[index]
+        record["move"] = NO_MOVE if move is None else move[0] * Othello_logic.COLUMN_SIZE + move[1]
+        record["status"] = DONE
+
+    def get_result(self, index):
+        """ Returns the best move (row, col) of a state or None if there isn't any """
+        move = int(self.records[index]["move"])
+        return None if move == NO_MOVE else divmod(move, Othello_logic.COLUMN_SIZE)
+
+    def evaluate(self, weight_list, indices):
+        """ Scores the states of the given slots by the heuristic in one batch (the utility of Minimax: white is the
+        agent), writes the scores to the slots and returns them """
+        records = self.records[indices]
+        scores = Heuristic.evaluate_batch(records["white"], records["black"], weight_list)
+        self.records["score"][indices] = scores
+        return scores
+
+    def close(self):
+        self.records = None  # the shared memory can't be closed while an array uses it
+        self.memory.close()
+
+    def unlink(self):
+        self.memory.unlink()
+
+
+def search_states(name, size, indices, weight_list, search_depth):
+    """ Runs in a worker process: finds the best move of the given slots of the pool with Minimax """
+    pool = StatePool(size, name)
+    try:
+        logic = Othello_logic.OthelloLogic()
+        minimax = Minimax.Minimax(logic, weight_list, search_depth=search_depth)
+        for index in indices:
+            (black, white, color, ply) = pool.get_state(index)
+            logic.load_position(black, white, TURNS[COLORS.index(color)])
+            pool.put_result(index, minimax.minimax_with_alpha_beta(Tree.Node(logic, ply), color))
+    finally:
+        pool.close()
+    return len(indices)
+
+
+def search_positions(positions, weight_list, search_depth=Minimax.MAX_DEPTH, workers=NUM_OF_WORKERS):
+    """ Finds the best moves of many positions ((black, white, color, ply) each) in worker processes through a
+    state pool and returns them in order """
+    pool = StatePool(len(positions))
+    try:
+        for index, position in enumerate(positions):
+            pool.put_state(index, *position)
+        chunks = numpy.array_split(numpy.arange(len(positions)), max(1, workers))
+        arguments = [(pool.name, pool.size, chunk.tolist(), weight_list, search_depth) for chunk in chunks if len(chunk)]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(search_states, *zip(*arguments)))
+        else:
+            for argument in arguments:
+                search_states(*argument)
+        return [pool.get_result(index) for index in range(len(positions))]
+    finally:
+        pool.close()
+        pool.unlink()
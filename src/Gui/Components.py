@@ -54,16 +54,17 @@ class GameBoard:
         """ Draw disks with proper colors in proper cells according to state of game_logic """
         cell_height = self.get_cell_height()
         cell_width = self.get_cell_width()
+        board = self.game_logic.get_board()  # built from the bitboards, so get it once
         for row in range(ROW_SIZE):
             for col in range(COLUMN_SIZE):
-                if self.game_logic.get_board()[row][col] != othello_logic.EMPTY:
+                if board[row][col] != othello_logic.EMPTY:
                     self.root.create_oval(
                         col * cell_width,  # top left point of the box in which the circle is drawn
                         row * cell_height,
                         (col + 1) * cell_width,  # bottom right point of the box
                         (row + 1) * cell_height,
                         outline=BG_COLOR,
-                        fill=('Black' if (self.game_logic.get_board()[row][col] == 'b') else 'White'),
+                        fill=('Black' if (board[row][col] == 'b') else 'White'),
                         width=2)
 
     # Getter functions
@@ -0,0 +1,195 @@
+"""
+    Bitboard helpers for the Othello logic
+    each side of the board is kept as a 64 bit integer, bit number (row * 8 + col) is set
+    when the side has a disk on (row, col)
+"""
+
+# Constant values
+ROW_SIZE, COLUMN_SIZE = (8, 8)
+FULL_BOARD = 0xFFFFFFFFFFFFFFFF
+NOT_FIRST_COLUMN = 0xFEFEFEFEFEFEFEFE  # every cell except column 0
+NOT_LAST_COLUMN = 0x7F7F7F7F7F7F7F7F  # every cell except column 7
+
+# (shift, mask) for each of the 8 directions, a positive shift is a left shift (moving to a bigger index)
+# the mask removes the bits that are wrapped around the board after shifting
+DIRECTIONS = (
+    (1, NOT_FIRST_COLUMN),  # (0, 1)
+    (-1, NOT_LAST_COLUMN),  # (0, -1)
+    (8, FULL_BOARD),  # (1, 0)
+    (9, NOT_FIRST_COLUMN),  # (1, 1)
+    (7, NOT_LAST_COLUMN),  # (1, -1)
+    (-8, FULL_BOARD),  # (-1, 0)
+    (-7, NOT_FIRST_COLUMN),  # (-1, 1)
+    (-9, NOT_LAST_COLUMN),  # (-1, -1)
+)
+
+
+def square_bit(row, col):
+    """ Returns the bit of the cell (row, col) """
+    return 1 << (row * COLUMN_SIZE + col)
+
+
+def popcount(bits):
+    """ Counts the number of disks in the given bitboard """
+    return bits.bit_count()
+
+
+def shift(bits, amount, mask):
+    """ Shifts all the disks one cell in the direction of (amount, mask) """
+    if amount > 0:
+        return (bits << amount) & mask & FULL_BOARD
+    return (bits >> -amount) & mask
+
+
+def neighbours(bits):
+    """ Returns a bitboard of the cells next to (in any of the 8 directions) the given cells """
+    result = 0
+    for amount, mask in DIRECTIONS:
+        result |= shift(bits, amount, mask)
+    return result
+
+
+def get_moves(own, opponent):
+    """ Returns a bitboard of all the empty cells that 'own' can move to """
+    empty = ~(own | opponent) & FULL_BOARD
+    moves = 0
+    for amount, mask in DIRECTIONS:
+        # the lines of opponent disks that start next to one of own disks (at most six disks long)
+        # masking the opponent disks once is enough to stop the lines from wrapping around the board
+        line_opponent = opponent & mask
+        if amount > 0:
+            candidates = (own << amount) & line_opponent
+            candidates |= (candidates << amount) & line_opponent
+            candidates |= (candidates << amount) & line_opponent
+            candidates |= (candidates << amount) & line_opponent
+            candidates |= (candidates << amount) & line_opponent
+            candidates |= (candidates << amount) & line_opponent
+            moves |= (candidates << amount) & mask & empty
+        else:
+            amount = -amount
+            candidates = (own >> amount) & line_opponent
+            candidates |= (candidates >> amount) & line_opponent
+            candidates |= (candidates >> amount) & line_opponent
+            candidates |= (candidates >> amount) & line_opponent
+            candidates |= (candidates >> amount) & line_opponent
+            candidates |= (candidates >> amount) & line_opponent
+            moves |= (candidates >> amount) & mask & empty
+    return moves
+
+
+def ray(bit, amount, mask):
+    """ Returns a bitboard of the cells from the given cell (not included) to the edge of the board in one direction """
+    bits = 0
+    cell = shift(bit, amount, mask)
+    while cell:
+        bits |= cell
+        cell = shift(cell, amount, mask)
+    return bits
+
+
+# rays of each cell in the directions that go to bigger indices (then the nearest cell of a ray is its lowest bit)
+# and in the directions that go to smaller indices (the nearest cell is the highest bit), built once at import
+UP_RAYS = tuple(tuple(ray(1 << index, amount, mask) for amount, mask in DIRECTIONS if amount > 0)
+                for index in range(ROW_SIZE * COLUMN_SIZE))
+DOWN_RAYS = tuple(tuple(ray(1 << index, amount, mask) for amount, mask in DIRECTIONS if amount < 0)
+                  for index in range(ROW_SIZE * COLUMN_SIZE))
+
+
+def get_flips(own, opponent, bit):
+    """ Returns a bitboard of the opponent disks that are flipped if 'own' moves to the given bit
+    (zero means the movement is not possible)
+    in every ray of the cell the opponent disks before the nearest cell that is not an opponent disk are flipped
+    if that cell is an own disk """
+    index = bit.bit_length() - 1
+    not_opponent = ~opponent
+    flips = 0
+    for line in UP_RAYS[index]:
+        blockers = line & not_opponent
+        nearest = blockers & -blockers
+        if nearest & own:
+            flips |= line & (nearest - 1)
+    for line in DOWN_RAYS[index]:
+        blockers = line & not_opponent
+        if blockers:
+            nearest = 1 << (blockers.bit_length() - 1)
+            if nearest & own:
+                flips |= line & -(nearest << 1)
+    return flips
+
+
+def iterate_cells(bits):
+    """ Yields (row, col) of every set bit from the smallest index to the biggest one """
+    while bits:
+        lowest = bits & -bits
+        index = lowest.bit_length() - 1
+        yield index // COLUMN_SIZE, index % COLUMN_SIZE
+        bits ^= lowest
+
+
+def to_board(black, white, black_ch, white_ch, empty_ch):
+    """ Builds the 2D array representation of the given bitboards """
+    board = [[empty_ch for i in range(COLUMN_SIZE)] for j in range(ROW_SIZE)]
+    for row, col in iterate_cells(black):
+        board[row][col] = black_ch
+    for row, col in iterate_cells(white):
+        board[row][col] = white_ch
+    return board
+
+
+def from_board(board, black_ch, white_ch):
+    """ Builds (black, white) bitboards from the 2D array representation of the board """
+    black = 0
+    white = 0
+    for row in range(ROW_SIZE):
+        for col in range(COLUMN_SIZE):
+            if board[row][col] == black_ch:
+                black |= square_bit(row, col)
+            elif board[row][col] == white_ch:
+                white |= square_bit(row, col)
+    return black, white
+
+
+# Symmetries of the board (the 8 rotations and reflections are compositions of these three)
+def flip_vertical(bits):
+    """ Mirrors the rows: (row, col) -> (7 - row, col) """
+    return int.from_bytes(bits.to_bytes(8, 'little'), 'big')
+
+
+def flip_horizontal(bits):
+    """ Mirrors the columns: (row, col) -> (row, 7 - col) """
+    bits = ((bits >> 1) & 0x5555555555555555) | ((bits & 0x5555555555555555) << 1)
+    bits = ((bits >> 2) & 0x3333333333333333) | ((bits & 0x3333333333333333) << 2)
+    return ((bits >> 4) & 0x0F0F0F0F0F0F0F0F) | ((bits & 0x0F0F0F0F0F0F0F0F) << 4)
+
+
+def flip_diagonal(bits):
+    """ Mirrors the board on its main diagonal: (row, col) -> (col, row) """
+    temp = 0x0F0F0F0F00000000 & (bits ^ (bits << 28))
+    bits ^= temp ^ (temp >> 28)
+    temp = 0x3333000033330000 & (bits ^ (bits << 14))
+    bits ^= temp ^ (temp >> 14)
+    temp = 0x5500550055005500 & (bits ^ (bits << 7))
+    return bits ^ temp ^ (temp >> 7)
+
+
+def transform(bits, index):
+    """ Applies one of the 8 symmetries of the board, index is a combination of
+    1 (flip_vertical), 2 (flip_horizontal) and 4 (flip_diagonal) applied in this order """
+    if index & 1:
+        bits = flip_vertical(bits)
+    if index & 2:
+        bits = flip_horizontal(bits)
+    if index & 4:
+        bits = flip_diagonal(bits)
+    return bits
+
+
+def inverse_transform(bits, index):
+    """ Takes back transform(bits, index) """
+    if index & 4:
+        bits = flip_diagonal(bits)
+    if index & 2:
+        bits = flip_horizontal(bits)
+    if index & 1:
+        bits = flip_vertical(bits)
+    return bits
@@ -0,0 +1,101 @@
+"""
+    Binary file format of played games
+    file: header (magic, version, metadata length) + metadata (JSON text, e.g. the settings of the agents) + games
+    game: header (number of movements, black disks, white disks, tag) + one byte per movement (row * 8 + col),
+    passes are not saved (the player of every movement is found by replaying the game)
+    tag is a free byte for the producer of the file (e.g. the agent that played black in self-play)
+    GameRecordWriter appends games to a file, GameRecordReader iterates them from a memory map without loading the file
+"""
+
+import json
+import mmap
+import os
+import struct
+
+# Constant values
+MAGIC = b'OGR1'
+VERSION = 1
+FILE_HEADER = struct.Struct('<4sHI')  # magic, version, length of the metadata
+GAME_HEADER = struct.Struct('<BBBB')  # number of movements, black disks, white disks, tag
+COLUMN_SIZE = 8
+NO_TAG = 255
+
+
+def encode_moves(move_list):
+    """ Packs a list of (row, col) movements to bytes """
+    return bytes(row * COLUMN_SIZE + col for row, col in move_list)
+
+
+def decode_moves(data):
+    """ Unpacks the movements of a game to a list of (row, col) """
+    return [divmod(cell, COLUMN_SIZE) for cell in data]
+
+
+class GameRecordWriter:
+    """ Appends games to a file (the header is written if the file is new)
+    used as a context manager or closed with close() """
+
+    def __init__(self, path, metadata=None):
+        self.path = path
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file:
+            read_file_header(path)  # checks the format of the existing file
+        self.file = open(path, 'ab')
+        if new_file:
+            data = json.dumps(metadata if metadata is not None else {}).encode()
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION, len(data)) + data)
+        self.games = 0  # games written by this writer
+
+    def write(self, move_list, black_disks, white_disks, tag=NO_TAG):
+        """ Appends one game, move_list is a list of (row, col) or the bytes of encode_moves """
+        data = move_list if isinstance(move_list, (bytes, bytearray)) else encode_moves(move_list)
+        self.file.write(GAME_HEADER.pack(len(data), black_disks, white_disks, tag) + data)
+        self.games += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_file_header(path):
+    """ Returns (metadata, offset of the first game) of a game record file """
+    with open(path, 'rb') as f:
+        (magic, version, length) = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a game record file: " + str(path))
+        return json.loads(f.read(length).decode()), FILE_HEADER.size + length
+
+
+class GameRecordReader:
+    """ Iterates the games of a file: (movement bytes, black disks, white disks, tag) for every game
+    the file is memory mapped, so only the pages of the games being read are loaded """
+
+    def __init__(self, path):
+        self.path = path
+        (self.metadata, self.start) = read_file_header(path)
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            size = os.path.getsize(self.path)
+            if size == self.start:  # no games (an empty file can't be mapped)
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                offset = self.start
+                while offset + GAME_HEADER.size <= size:
+                    (count, black_disks, white_disks, tag) = GAME_HEADER.unpack_from(data, offset)
+                    offset += GAME_HEADER.size
+                    if offset + count > size:  # the last game was not written completely
+                        return
+                    yield data[offset:offset + count], black_disks, white_disks, tag
+                    offset += count
+
+    def __len__(self):
+        return sum(1 for game in self)
@@ -7,6 +7,8 @@
 
 import src.Agent.Minimax
 import src.Agent.Tree
+import src.Logic.Bitboard
+import src.Logic.Zobrist
 from enum import Enum
 
 
@@ -28,7 +30,9 @@ EMPTY = '_'
 
 Minimax = src.Agent.Minimax
 Tree = src.Agent.Tree
-possible_moves = []  # List of possible actions
+Bitboard = src.Logic.Bitboard
+Zobrist = src.Logic.Zobrist
+ZOBRIST_KEYS = {BLACK: Zobrist.BLACK_KEYS, WHITE: Zobrist.WHITE_KEYS}
 
 OPTIMUM_WEIGHTS = [51, 151, 74, 97, 103, 78, 151, 126, 26]
 # [97, 113, 49, 159, 153, 38, 128, 104, 3]  one hour training
@@ -53,53 +57,127 @@ def init_game_board():
 
 # This class controls the flow of game
 class OthelloLogic:
-    """ Everything about the game's logic """
+    """ Everything about the game's logic
+    the board is stored as two bitboards (one 64 bit integer for each color), see Bitboard.py
+    """
 
     def __init__(self):
         # Attributes
         self.row_size = ROW_SIZE
         self.col_size = COLUMN_SIZE
         self.turn = Player.BLACK.value
-        self.board = init_game_board()
+        black, white = Bitboard.from_board(init_game_board(), BLACK, WHITE)
+        self.disks = {BLACK: black, WHITE: white}  # bitboard of each color
+        self.zobrist_hash = Zobrist.hash_disks(black, white)  # hash of the disks, updated with every movement
+        # kept up to date with every movement (and restored by undo_move) instead of scanning the board
+        self.empty = ~(black | white) & Bitboard.FULL_BOARD  # bitboard of the empty cells
+        self.moves = {BLACK: None, WHITE: None}  # bitboard of possible movements of each color, None if not known
         self.minimax = Minimax.Minimax(self, OPTIMUM_WEIGHTS)  # Make instance of Minimax class
 
+    def load_position(self, black, white, turn):
+        """ Replaces the state of the game with the given bitboards and turn (Player.BLACK.value/Player.WHITE.value) """
+        self.disks = {BLACK: black, WHITE: white}
+        self.zobrist_hash = Zobrist.hash_disks(black, white)
+        self.empty = ~(black | white) & Bitboard.FULL_BOARD
+        self.moves = {BLACK: None, WHITE: None}
+        self.turn = turn
+
+    @property
+    def board(self):
+        """ 2D array representation of the board (built from the bitboards) """
+        return Bitboard.to_board(self.disks[BLACK], self.disks[WHITE], BLACK, WHITE, EMPTY)
+
     def move(self, row, col):  # this function is only called in the Minimax class
         """ Try to perform a movement to given cell
          used only in Minimax algorithm
          """
+        self.apply_move(row, col)
+
+    def apply_move(self, row, col):
+        """ Performs the movement of the player whose turn is now to given cell in place
+        returns a move record (player_ch, cell bit, flipped disks, previous turn, previous hash, previous possible
+        movements of black and white) that undo_move uses to take the movement back,
+        flipped disks is zero if the movement was not possible and nothing has changed
+        """
 
         player_ch = BLACK if self.turn == Player.BLACK.value else WHITE
         opponent_ch = WHITE if self.turn == Player.BLACK.value else BLACK
+        bit = Bitboard.square_bit(row, col)
+        flips = 0
 
         # Check if the movement is valid (destination cell should be on board and also be empty)
         try:
             if self.valid_cell(row, col):
-                if self.check_movements(player_ch, row, col, False):
-                    self.check_movements(player_ch, row, col, True)
+                flips = Bitboard.get_flips(self.disks[player_ch], self.disks[opponent_ch], bit)
+                if flips:
+                    record = (player_ch, bit, flips, self.turn, self.zobrist_hash, self.moves[BLACK],
+                              self.moves[WHITE])
+                    self.place_disks(player_ch, opponent_ch, bit, flips)
                     if self.player_has_any_moves(opponent_ch, True):
                         self.turn = Player.WHITE.value if self.turn == Player.BLACK.value else Player.BLACK.value
-                else:
-                    return
             else:
                 raise MovementError()
         except MovementError:
             pass
+        if not flips:
+            return player_ch, bit, 0, self.turn, self.zobrist_hash, self.moves[BLACK], self.moves[WHITE]
+        return record
+
+    def place_disks(self, player_ch, opponent_ch, bit, flips):
+        """ Puts a disk of player_ch on bit, flips the given opponent disks and updates everything that depends on
+        the disks (hash, empty cells and possible movements) """
+        self.disks[player_ch] |= flips | bit
+        self.disks[opponent_ch] &= ~flips
+        index = bit.bit_length() - 1
+        self.zobrist_hash ^= ZOBRIST_KEYS[player_ch][index] ^ Zobrist.flip_hash(flips)
+        self.empty ^= bit
+        self.moves[BLACK] = None
+        self.moves[WHITE] = None
+
+    def disks_after_move(self, row, col):
+        """ Returns (black disks, white disks) after the movement of the player whose turn is now to given cell
+        without changing the game (the cell must be a possible movement) """
+        player_ch = BLACK if self.turn == Player.BLACK.value else WHITE
+        opponent_ch = WHITE if self.turn == Player.BLACK.value else BLACK
+        bit = Bitboard.square_bit(row, col)
+        flips = Bitboard.get_flips(self.disks[player_ch], self.disks[opponent_ch], bit)
+        disks = {player_ch: self.disks[player_ch] | flips | bit, opponent_ch: self.disks[opponent_ch] & ~flips}
+        return disks[BLACK], disks[WHITE]
+
+    def position_after_move(self, row, col):
+        """ Returns (black disks, white disks, zobrist hash) after the movement of the player whose turn is now to
+        given cell without changing the game (the cell must be a possible movement) """
+        player_ch = BLACK if self.turn == Player.BLACK.value else WHITE
+        opponent_ch = WHITE if self.turn == Player.BLACK.value else BLACK
+        bit = Bitboard.square_bit(row, col)
+        flips = Bitboard.get_flips(self.disks[player_ch], self.disks[opponent_ch], bit)
+        disks = {player_ch: self.disks[player_ch] | flips | bit, opponent_ch: self.disks[opponent_ch] & ~flips}
+        zobrist_hash = self.zobrist_hash ^ ZOBRIST_KEYS[player_ch][row * COLUMN_SIZE + col] ^ Zobrist.flip_hash(flips)
+        return disks[BLACK], disks[WHITE], zobrist_hash
+
+    def undo_move(self, record):
+        """ Takes back a movement made by apply_move using its move record """
+        (player_ch, bit, flips, turn, zobrist_hash, black_moves, white_moves) = record
+        if flips:
+            opponent_ch = BLACK if player_ch == WHITE else WHITE
+            self.disks[player_ch] &= ~(flips | bit)
+            self.disks[opponent_ch] |= flips
+            self.empty |= bit
+        self.turn = turn
+        self.zobrist_hash = zobrist_hash
+        self.moves[BLACK] = black_moves
+        self.moves[WHITE] = white_moves
 
     def valid_cell(self, row, col):
         """ Check if the desired cell is within the board's boundary and selected cell is empty """
-        if (0 <= row < self.row_size) & (0 <= col < self.col_size) & (self.board[row][col] == EMPTY):
-            return True
+        if (0 <= row < self.row_size) & (0 <= col < self.col_size):
+            return (self.empty & Bitboard.square_bit(row, col)) != 0
         else:
             return False
 
     def score_calculate(self, player_color):
         """ Count the total number of disks with the color of player_color """
-        score = 0
-        for row in range(ROW_SIZE):
-            for col in range(COLUMN_SIZE):
-                if self.board[row][col] == player_color:
-                    score += 1
-        return score
+        return Bitboard.popcount(self.disks[player_color])
 
     def find_winner(self):
         """ Find winner by calculating score for each player """
@@ -123,77 +201,55 @@ class OthelloLogic:
         """ Checks if movement from (row, col) is possible and makes the moves if 'move' is true """
         opponent_ch = BLACK if player_ch == WHITE else WHITE
 
-        moved = False
-        dir_list = [[0, 1], [0, -1], [1, 0], [1, 1], [1, -1], [-1, 0], [-1, 1], [-1, -1]]
-
-        for direction in dir_list:
-            if self.check_direction(row, col, direction[0], direction[1], player_ch, opponent_ch, move):
-                moved = True
-        return moved
-
-    def check_direction(self, row, col, x_dir, y_dir, player_ch, opponent_ch, move):
-        """ Checks if movement from (row, col) in (x_dir, y_dir) direction is possible and makes the moves if 'move' is true """
-        can_move = False
-        x = row + x_dir
-        y = col + y_dir
-        first_time = True
-        while -1 < x < ROW_SIZE and -1 < y < COLUMN_SIZE:
-            if first_time:
-                first_time = False
-                if self.board[x][y] != opponent_ch:
-                    break
-            else:
-                if self.board[x][y] == EMPTY:
-                    break
-                elif self.board[x][y] == opponent_ch:
-                    x += x_dir
-                    y += y_dir
-                    continue
-                elif self.board[x][y] == player_ch:
-                    can_move = True
-                    break
-            x += x_dir
-            y += y_dir
-        # make the moves if it's desired(move) and possible(can_move)
-        if can_move and move:
-            x = row
-            y = col
-            while -1 < x < ROW_SIZE and -1 < y < COLUMN_SIZE:
-                if x != row or y != col:  # if a move was made (any disks were swapped)
-                    if self.board[x][y] == player_ch:
-                        break
-                self.board[x][y] = player_ch
-                x += x_dir
-                y += y_dir
-        return can_move
+        bit = Bitboard.square_bit(row, col)
+        flips = Bitboard.get_flips(self.disks[player_ch], self.disks[opponent_ch], bit)
+        # make the moves if it's desired(move) and possible(any disks are flipped)
+        if flips and move:
+            self.place_disks(player_ch, opponent_ch, bit, flips)
+        return flips != 0
+
+    def moves_bitboard(self, player_ch):
+        """ Returns the bitboard of all the cells that player_ch can move to
+        found once for each position (until the disks change) """
+        moves = self.moves[player_ch]
+        if moves is None:
+            opponent_ch = BLACK if player_ch == WHITE else WHITE
+            moves = Bitboard.get_moves(self.disks[player_ch], self.disks[opponent_ch])
+            self.moves[player_ch] = moves
+        return moves
+
+    def number_of_empty_cells(self):
+        return Bitboard.popcount(self.empty)
+
+    def get_empty_cells(self):
+        """ Returns the list of (row, col) of the empty cells """
+        return list(Bitboard.iterate_cells(self.empty))
+
+    def frontier_disks(self, player_ch):
+        """ Returns the bitboard of player_ch disks that are next to at least one empty cell """
+        return self.disks[player_ch] & Bitboard.neighbours(self.empty)
 
     def player_has_any_moves(self, player_ch, check_only):
-        """ checks if the player has any movements on board """
-        for x in range(ROW_SIZE):
-            for y in range(COLUMN_SIZE):
-                if self.valid_cell(x, y):
-                    if self.check_movements(player_ch, x, y, False):
-                        # If the purpose is only check the player has any moves or not
-                        if check_only:
-                            return True
-                        else:
-                            # add coordination to the list of possible movements
-                            possible_moves.append((x, y))
+        """ checks if the player has any movements on board
+        returns a tuple of the coordinations of the movements if check_only is false """
+        moves = self.moves_bitboard(player_ch)
+        # If the purpose is only check the player has any moves or not
         if check_only:
-            return False
+            return moves != 0
+        return tuple(Bitboard.iterate_cells(moves))
 
     # For debug purposes
     def print_table(self):
+        board = self.board
         for i in range(8):
             for j in range(8):
-                print(self.board[i][j] if self.board[i][j] != EMPTY else 'n', end='')
+                print(board[i][j] if board[i][j] != EMPTY else 'n', end='')
             print()
 
-    # Return list of possible movements for given player
+    # Return a new tuple of possible movements for given player (nothing is shared between calls)
+    # moves_bitboard gives the same movements as a bitboard
     def get_possible_moves(self, player):
-        possible_moves.clear()
-        self.player_has_any_moves(player, False)
-        return possible_moves  # if there is no move, the list will remain empty
+        return self.player_has_any_moves(player, False)  # if there is no move, the tuple will be empty
 
     # Getter functions
     def get_turn(self):
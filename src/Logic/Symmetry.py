@@ -0,0 +1,62 @@
+"""
+    Symmetries of Othello positions
+    a position has 8 equivalent positions (the rotations and reflections of the board, see Bitboard.transform), caches
+    that are keyed by canonical_hash (or canonical_position) store one result for all of them; the moves of a
+    canonical position are mapped back with inverse_transform_move
+"""
+
+import src.Logic.Bitboard as Bitboard
+
+# Constant values
+NUM_OF_SYMMETRIES = 8
+IDENTITY = 0  # symmetry index that doesn't change the board
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def all_symmetries(bits):
+    """ Returns the 8 transforms of bits, the i-th item is Bitboard.transform(bits, i) """
+    vertical = Bitboard.flip_vertical(bits)
+    horizontal = Bitboard.flip_horizontal(bits)
+    both = Bitboard.flip_horizontal(vertical)
+    return (bits, vertical, horizontal, both, Bitboard.flip_diagonal(bits), Bitboard.flip_diagonal(vertical),
+            Bitboard.flip_diagonal(horizontal), Bitboard.flip_diagonal(both))
+
+
+def canonical_position(first, second):
+    """ Returns (first, second, symmetry index) of the smallest of the 8 equivalent positions
+    (first and second are the disks of the two colors, e.g. black and white or the player to move and the opponent) """
+    return min(zip(all_symmetries(first), all_symmetries(second), range(NUM_OF_SYMMETRIES)))
+
+
+def mix(bits):
+    """ splitmix64 finalizer, spreads the bits of a 64 bit integer """
+    bits = ((bits ^ (bits >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    bits = ((bits ^ (bits >> 27)) * 0x94D049BB133111EB) & MASK64
+    return bits ^ (bits >> 31)
+
+
+def position_hash(first, second):
+    """ 64 bit hash of a position computed from scratch (Zobrist hashes are faster to update after a movement) """
+    return mix(first ^ mix(second))
+
+
+def canonical_hash(first, second):
+    """ Returns (hash, symmetry index), the hash is the same for all the 8 equivalent positions """
+    (first, second, symmetry) = canonical_position(first, second)
+    return position_hash(first, second), symmetry
+
+
+def transform_move(move, symmetry):
+    """ Maps a (row, col) movement of a position to the transformed position (None stays None) """
+    if move is None or symmetry == IDENTITY:
+        return move
+    index = Bitboard.transform(Bitboard.square_bit(move[0], move[1]), symmetry).bit_length() - 1
+    return index // Bitboard.COLUMN_SIZE, index % Bitboard.COLUMN_SIZE
+
+
+def inverse_transform_move(move, symmetry):
+    """ Maps a (row, col) movement of a transformed position back to the original position (None stays None) """
+    if move is None or symmetry == IDENTITY:
+        return move
+    index = Bitboard.inverse_transform(Bitboard.square_bit(move[0], move[1]), symmetry).bit_length() - 1
+    return index // Bitboard.COLUMN_SIZE, index % Bitboard.COLUMN_SIZE
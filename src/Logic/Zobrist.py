@@ -0,0 +1,44 @@
+"""
+    Zobrist hashing of Othello positions
+    every (color, cell) pair gets a fixed random 64 bit key, the hash of a position is the xor of the keys of its
+    disks, so a movement can update the hash incrementally
+    the turn is not a part of the hash, users that need it (e.g. the transposition table) mix in TURN_KEY themselves
+"""
+
+import random
+
+# Constant values
+SEED = 1400  # fixed seed, so hashes are the same in every run (and in every process)
+NUM_OF_CELLS = 64
+
+_generator = random.Random(SEED)
+BLACK_KEYS = tuple(_generator.getrandbits(64) for i in range(NUM_OF_CELLS))
+WHITE_KEYS = tuple(_generator.getrandbits(64) for i in range(NUM_OF_CELLS))
+FLIP_KEYS = tuple(BLACK_KEYS[i] ^ WHITE_KEYS[i] for i in range(NUM_OF_CELLS))  # changes the color of a disk
+TURN_KEY = _generator.getrandbits(64)
+
+
+def hash_disks(black, white):
+    """ Computes the hash of a position from scratch """
+    zobrist_hash = 0
+    for index in range(NUM_OF_CELLS):
+        if (black >> index) & 1:
+            zobrist_hash ^= BLACK_KEYS[index]
+        elif (white >> index) & 1:
+            zobrist_hash ^= WHITE_KEYS[index]
+    return zobrist_hash
+
+
+def flip_hash(flips):
+    """ Returns the value that changes the hash when the given disks change their color """
+    zobrist_hash = 0
+    while flips:
+        lowest = flips & -flips
+        zobrist_hash ^= FLIP_KEYS[lowest.bit_length() - 1]
+        flips ^= lowest
+    return zobrist_hash
+
+
+def weights_key(weight_list):
+    """ Returns a 64 bit key for a weight list, mixed into the hash when cached values depend on the weights """
+    return random.Random(" ".join(str(x) for x in weight_list)).getrandbits(64)